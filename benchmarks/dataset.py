@@ -0,0 +1,67 @@
+import random
+
+from catalog.models import Blog, Category, Product, Version
+from users.models import User
+
+BATCH_SIZE = 1000  # Количество записей в одной вставке.
+
+
+def seed_dataset(categories=10, products=1000, versions=3, users=50, blogs=100, seed=0):
+    """
+    Заполняет базу данных детерминированным набором данных
+    для нагрузочного тестирования. Возвращает суперпользователя,
+    от имени которого выполняются запросы.
+    """
+    rng = random.Random(seed)
+
+    admin = User.objects.create(
+        email='bench-admin@example.com',
+        first_name='Bench',
+        is_active=True,
+        is_staff=True,
+        is_superuser=True,
+    )
+    user_list = User.objects.bulk_create([
+        User(email=f'bench-{i}@example.com', first_name=f'User {i}', is_active=True)
+        for i in range(users)
+    ], batch_size=BATCH_SIZE) or [admin]
+
+    category_list = Category.objects.bulk_create([
+        Category(title=f'Категория {i}', description=f'Описание категории {i}')
+        for i in range(categories)
+    ], batch_size=BATCH_SIZE)
+
+    product_list = Product.objects.bulk_create([
+        Product(
+            title=f'Игра {i}',
+            description=f'Описание игры {i}. ' * rng.randint(1, 10),
+            category=rng.choice(category_list),
+            price=rng.randint(100, 10000) / 100,
+            is_published=rng.random() < 0.9,
+            creator=rng.choice(user_list),
+        )
+        for i in range(products)
+    ], batch_size=BATCH_SIZE)
+
+    Version.objects.bulk_create([
+        Version(
+            product=product,
+            version_number=f'{number}.0',
+            title=f'Версия {number}',
+            is_active=number == versions,
+        )
+        for product in product_list
+        for number in range(1, versions + 1)
+    ], batch_size=BATCH_SIZE)
+
+    Blog.objects.bulk_create([
+        Blog(
+            title=f'Запись {i}',
+            slug=f'bench-{i}',
+            description=f'Текст записи {i}. ' * rng.randint(5, 50),
+            creator=rng.choice(user_list),
+        )
+        for i in range(blogs)
+    ], batch_size=BATCH_SIZE)
+
+    return admin
@@ -0,0 +1,112 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from catalog.models import Blog, Category, Product
+
+
+def get_scenarios():
+    """
+    Возвращает адреса горячих страниц каталога по сценариям.
+    Для списков и карточек берутся самые большие категория и записи.
+    """
+    largest = Category.objects.annotate(
+        product_count=Count('product')
+    ).order_by('-product_count', 'id').first()
+    product = Product.objects.filter(category=largest, is_published=True).first()
+    blog = Blog.objects.filter(is_published=True).first()
+
+    scenarios = {
+        'main': reverse('catalog:main'),
+        'category_list': reverse('catalog:categories'),
+        'blog_list': reverse('catalog:blog_list'),
+    }
+    if largest is not None:
+        scenarios['product_list'] = reverse('catalog:goods', kwargs={'pk': largest.pk})
+    if product is not None:
+        scenarios['product_detail'] = reverse('catalog:product', kwargs={'pk': product.pk})
+    if blog is not None:
+        scenarios['blog_detail'] = reverse('catalog:blog_detail', kwargs={'slug': blog.slug})
+
+    return scenarios
+
+
+def percentile(values, percent):
+    """ Возвращает перцентиль списка значений. """
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def run_scenario(url, user, requests=100, concurrency=4):
+    """
+    Выполняет запросы к странице через тестовый клиент Django
+    с заданной параллельностью. Возвращает статистику задержек,
+    количества SQL-запросов и пропускной способности.
+    """
+    def worker(count):
+        client = Client()
+        client.force_login(user)
+        latencies, queries, errors = [], [], 0
+        executed = []
+
+        def count_query(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        try:
+            for __ in range(count):
+                executed.clear()
+                with ExitStack() as stack:
+                    # Запросы считаются по всем базам, включая реплики.
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(count_query))
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append(time.perf_counter() - start)
+                queries.append(len(executed))
+                if response.status_code >= 400:
+                    errors += 1
+        finally:
+            # Каждый поток открывает свое соединение с базой данных.
+            connections.close_all()
+
+        return latencies, queries, errors
+
+    counts = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, counts))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(value for result in results for value in result[0])
+    queries = [value for result in results for value in result[1]]
+
+    return {
+        'url': url,
+        'requests': len(latencies),
+        'errors': sum(result[2] for result in results),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else 0,
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0,
+    }
+
+
+def run_benchmarks(user, requests=100, concurrency=4, scenarios=None):
+    """ Выполняет все сценарии и возвращает результаты по каждому. """
+    urls = get_scenarios()
+    if scenarios:
+        urls = {name: url for name, url in urls.items() if name in scenarios}
+
+    return {
+        name: run_scenario(url, user, requests, concurrency)
+        for name, url in urls.items()
+    }
@@ -1,6 +1,10 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F
 
-from catalog.models import Product, Category, Contact, Blog, Version
+from catalog.models import Product, Category, Contact, Blog, Version, BannedWord
+from catalog.services import get_search_query
 from users.models import User
 
 
@@ -25,6 +29,25 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description',)
     actions = [make_published, set_admin]
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет товары полнотекстовым поиском по индексу search_vector.
+        Если не выбрана сортировка по столбцу, результаты сортируются
+        по релевантности, как в search_products.
+        """
+        if not search_term:
+            return queryset, False
+
+        query = get_search_query(search_term)
+        queryset = queryset.filter(search_vector=query)
+        if ORDER_VAR not in request.GET:
+            # Список изменений уже отсортирован: релевантность ставим первой.
+            queryset = queryset.annotate(
+                rank=SearchRank(F('search_vector'), query)
+            ).order_by('-rank', *queryset.query.order_by)
+
+        return queryset, False
+
 
 @admin.register(Version)
 class VersionAdmin(admin.ModelAdmin):
@@ -49,3 +72,11 @@ class BlogAdmin(admin.ModelAdmin):
     """ Отображение блоговых записей в административной панели. """
     list_display = ('id', 'title', 'description', 'creation_date', 'view_count',)
     list_filter = ('creation_date', 'view_count',)
+
+
+@admin.register(BannedWord)
+class BannedWordAdmin(admin.ModelAdmin):
+    """ Отображение запрещенных слов в административной панели. """
+    list_display = ('id', 'term', 'is_active',)
+    list_filter = ('is_active',)
+    search_fields = ('term',)
@@ -5,3 +5,7 @@ class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
     verbose_name = 'Каталог'
+
+    def ready(self):
+        """ Подключает обработчики сигналов приложения. """
+        import catalog.signals  # noqa: F401
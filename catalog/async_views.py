@@ -0,0 +1,207 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.generic.base import ContextMixin
+from django.views.generic.detail import SingleObjectMixin, SingleObjectTemplateResponseMixin
+from django.views.generic.list import MultipleObjectMixin, MultipleObjectTemplateResponseMixin
+
+from catalog.caching import acached
+from catalog.middleware import render_page
+from catalog.mixins import (AsyncConditionalGetMixin, AsyncLoginRequiredMixin,
+                            AsyncObjectPermissionRequiredMixin, AsyncUserMixin,
+                            KeysetPaginationMixin)
+from catalog.models import Blog, Category, Product
+from catalog.services import (aget_categories_cache, aget_category_cache,
+                              aget_product_detail_cache_key, aget_viewer_role,
+                              get_category_products, get_main_products, get_published_blogs)
+
+
+class AsyncListView(MultipleObjectTemplateResponseMixin, MultipleObjectMixin, View):
+    """
+    Асинхронная версия ListView: записи и страница загружаются
+    асинхронным ORM, шаблон рендерится обработчиком Django.
+    """
+
+    async def aget_queryset(self):
+        """ Асинхронная версия get_queryset. """
+        return self.get_queryset()
+
+    async def aget_context_data(self, **kwargs):
+        """ Асинхронная версия get_context_data. """
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size:
+            paginator, page, object_list, is_paginated = await self.apaginate_queryset(
+                self.object_list, page_size
+            )
+        else:
+            paginator, page, is_paginated = None, None, False
+            if isinstance(self.object_list, list):
+                object_list = self.object_list
+            else:
+                object_list = [obj async for obj in self.object_list]
+
+        context = {
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': is_paginated,
+            'object_list': object_list,
+            **kwargs,
+        }
+        # Пагинация уже выполнена, берем только общий контекст представления.
+        return ContextMixin.get_context_data(self, **context)
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = await self.aget_queryset()
+        context = await self.aget_context_data()
+        return self.render_to_response(context)
+
+
+class MainListView(AsyncUserMixin, AsyncConditionalGetMixin, AsyncListView):
+    """ Асинхронная версия главной страницы. """
+    model = Product  # Модель товара.
+    template_name = 'catalog/main.html'  # Шаблон главной страницы.
+    extra_context = {'title': 'Skystore'}  # Название главной страницы.
+
+    async def aget_validators(self):
+        """ Валидаторы страницы: изменения опубликованных товаров, роль и пользователь. """
+        published, role = await asyncio.gather(
+            Product.objects.filter(is_published=True).aaggregate(
+                last_modified=Max('date_modified'), count=Count('id')
+            ),
+            aget_viewer_role(self.request.user),
+        )
+
+        # Карточки владельца содержат кнопки управления: учитываем пользователя.
+        parts = (published['last_modified'], published['count'], role, self.request.user.pk)
+
+        return parts, published['last_modified']
+
+    def get_queryset(self):
+        """ Возвращает 6 опубликованных товаров вместе с продавцами. """
+        return get_main_products(super().get_queryset())
+
+
+class CategoryListView(AsyncUserMixin, AsyncConditionalGetMixin, AsyncListView):
+    """ Асинхронная версия страницы с жанрами игр. """
+    model = Category  # Модель жанра(категории).
+    template_name = 'catalog/category_list.html'  # Шаблон списка жанров.
+    extra_context = {'title': 'Жанры'}  # Название страницы.
+
+    async def aget_queryset(self):
+        """ Возвращает список категорий из кэша или базы данных. """
+        if not hasattr(self, 'category_list'):
+            self.category_list = await aget_categories_cache()
+        return self.category_list
+
+    async def aget_validators(self):
+        """ Валидаторы страницы: содержимое категорий и роль. """
+        category_list, role = await asyncio.gather(
+            self.aget_queryset(), aget_viewer_role(self.request.user)
+        )
+        parts = [
+            (category.pk, category.title, category.description, category.image)
+            for category in category_list
+        ]
+        parts.append(role)
+
+        return parts, None
+
+
+class ProductListView(AsyncUserMixin, AsyncConditionalGetMixin, KeysetPaginationMixin,
+                      AsyncListView):
+    """ Асинхронная версия страницы с играми определенного жанра. """
+    model = Product  # Модель товара.
+    template_name = 'catalog/product_list.html'  # Шаблон списка игр.
+    cursor_fields = ('date_add', 'id')  # Поля курсора пагинации.
+
+    def get_queryset(self):
+        """
+        Возвращает список товаров по номеру категории и
+        статусу публикации для отображения на странице.
+        """
+        return get_category_products(self.kwargs.get('pk'), super().get_queryset())
+
+    async def aget_validators(self):
+        """
+        Валидаторы страницы: категория, изменения ее опубликованных
+        товаров (включая версии и имена продавцов), роль и пользователь.
+        """
+        published = Q(product__is_published=True)
+        category, role = await asyncio.gather(
+            Category.objects.filter(pk=self.kwargs.get('pk')).annotate(
+                last_modified=Max('product__date_modified', filter=published),
+                count=Count('product', filter=published),
+            ).values_list('title', 'description', 'last_modified', 'count').afirst(),
+            aget_viewer_role(self.request.user),
+        )
+        if category is None:
+            raise Http404('Категория не найдена.')
+
+        # Карточки владельца содержат кнопки управления: учитываем пользователя.
+        return (*category, role, self.request.user.pk), category[2]
+
+    async def aget_context_data(self, **kwargs):
+        """
+        Возвращает контекст: страницу игр категории и категорию,
+        которые загружаются одновременно.
+        """
+        context_data, category = await asyncio.gather(
+            super().aget_context_data(**kwargs),
+            aget_category_cache(pk=self.kwargs.get('pk')),
+        )
+        context_data['category'] = category  # Объект категории.
+        context_data['title'] = category  # Название страницы.
+
+        return context_data
+
+
+class ProductDetailView(AsyncUserMixin, AsyncLoginRequiredMixin,
+                        AsyncObjectPermissionRequiredMixin, AsyncConditionalGetMixin,
+                        SingleObjectTemplateResponseMixin, SingleObjectMixin, View):
+    """ Асинхронная версия страницы определенной игры. """
+    model = Product
+    template_name = 'catalog/product_detail.html'  # Шаблон страницы игры.
+    permission_required = ('catalog.view_product',)
+    object_select_related = ('creator', 'category')
+
+    async def aget_validators(self):
+        """ Валидаторы страницы: время изменения товара и роль пользователя. """
+        product = await self.aget_object()  # Объект уже загружен проверкой прав.
+        role = await aget_viewer_role(self.request.user, product)
+
+        return (product.pk, product.date_modified, role), product.date_modified
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Возвращает страницу товара из кэша. Ключ учитывает время
+        изменения товара и роль пользователя, права уже проверены.
+        """
+        self.object = await self.aget_object()
+        if not settings.CACHE_ENABLED:
+            return self.render_to_response(self.get_context_data(object=self.object))
+
+        request.page_cache = 'hit'  # Сбрасывается render_page при промахе.
+
+        async def render():
+            response = self.render_to_response(self.get_context_data(object=self.object))
+            return await sync_to_async(render_page)(request, response)
+
+        key = await aget_product_detail_cache_key(self.object, request.user)
+        return HttpResponse(await acached(key, settings.CACHE_TIMEOUT, render))
+
+
+class BlogListView(AsyncUserMixin, AsyncLoginRequiredMixin, KeysetPaginationMixin,
+                   AsyncListView):
+    """ Асинхронная версия страницы блога. """
+    model = Blog  # Модель.
+    template_name = 'catalog/blog_list.html'  # Шаблон блога.
+    extra_context = {'title': 'Наш блог'}  # Название страницы.
+    cursor_fields = ('-creation_date', '-id')  # Поля курсора пагинации.
+
+    def get_queryset(self):
+        """ Возвращает опубликованные записи вместе с авторами. """
+        return get_published_blogs(super().get_queryset())
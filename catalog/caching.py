@@ -0,0 +1,129 @@
+import asyncio
+import math
+import random
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+
+LOCK_TIMEOUT = 10  # Время жизни блокировки пересчета значения (сек.).
+STALE_TIMEOUT = 5 * 60  # Сколько устаревшее значение хранится после срока (сек.).
+WAIT_INTERVAL = 0.05  # Интервал ожидания значения, пересчитываемого другим процессом (сек.).
+WAIT_ATTEMPTS = 20  # Количество попыток дождаться значения.
+BETA = 1.0  # Коэффициент раннего пересчета (больше - раньше).
+
+# Значение в кэше: данные, время их вычисления и срок годности (time.time()).
+CacheEntry = namedtuple('CacheEntry', ('value', 'delta', 'expiry'))
+
+
+def get_lock_key(key):
+    """ Возвращает ключ блокировки пересчета значения. """
+    return f'{key}_lock'
+
+
+def make_entry(value, ttl, delta=0.0):
+    """ Упаковывает значение со сроком годности ttl (сек.). """
+    return CacheEntry(value, delta, time.time() + ttl)
+
+
+def get_entry(key):
+    """ Возвращает запись кэша или None, если ее нет или она в старом формате. """
+    entry = cache.get(key)
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+def is_fresh(entry, beta=BETA):
+    """
+    Проверяет срок годности с вероятностным ранним истечением:
+    чем ближе срок и дольше вычисление значения, тем вероятнее
+    пересчет, поэтому ключи не истекают у всех процессов сразу.
+    """
+    return time.time() - entry.delta * beta * math.log(1 - random.random()) < entry.expiry
+
+
+def set_cached_many(values, ttl, delta=0.0):
+    """ Записывает значения в кэш в формате cached. """
+    cache.set_many(
+        {key: make_entry(value, ttl, delta) for key, value in values.items()},
+        ttl + STALE_TIMEOUT,
+    )
+
+
+def refresh(key, ttl, loader):
+    """ Вычисляет значение и записывает его в кэш. """
+    start = time.perf_counter()
+    value = loader()
+    cache.set(key, make_entry(value, ttl, time.perf_counter() - start), ttl + STALE_TIMEOUT)
+    return value
+
+
+def cached(key, ttl, loader):
+    """
+    Возвращает значение из кэша или вычисляет его функцией loader.
+    Значение пересчитывает только процесс, получивший блокировку:
+    остальные отдают устаревшее значение или, если его нет,
+    ждут, пока оно появится в кэше. Значения истекают вероятностно
+    немного раньше ttl и хранятся еще STALE_TIMEOUT после него.
+    """
+    entry = get_entry(key)
+    if entry is not None and is_fresh(entry):
+        return entry.value
+
+    lock_key = get_lock_key(key)
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            return refresh(key, ttl, loader)
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        return entry.value
+
+    for __ in range(WAIT_ATTEMPTS):
+        time.sleep(WAIT_INTERVAL)
+        entry = get_entry(key)
+        if entry is not None:
+            return entry.value
+
+    # Значение не появилось: вычисляем его сами, не дожидаясь блокировки.
+    return refresh(key, ttl, loader)
+
+
+async def aget_entry(key):
+    """ Асинхронная версия get_entry. """
+    entry = await cache.aget(key)
+    return entry if isinstance(entry, CacheEntry) else None
+
+
+async def arefresh(key, ttl, loader):
+    """ Асинхронная версия refresh, loader - асинхронная функция. """
+    start = time.perf_counter()
+    value = await loader()
+    await cache.aset(key, make_entry(value, ttl, time.perf_counter() - start),
+                     ttl + STALE_TIMEOUT)
+    return value
+
+
+async def acached(key, ttl, loader):
+    """ Асинхронная версия cached, loader - асинхронная функция. """
+    entry = await aget_entry(key)
+    if entry is not None and is_fresh(entry):
+        return entry.value
+
+    lock_key = get_lock_key(key)
+    if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            return await arefresh(key, ttl, loader)
+        finally:
+            await cache.adelete(lock_key)
+
+    if entry is not None:
+        return entry.value
+
+    for __ in range(WAIT_ATTEMPTS):
+        await asyncio.sleep(WAIT_INTERVAL)
+        entry = await aget_entry(key)
+        if entry is not None:
+            return entry.value
+
+    return await arefresh(key, ttl, loader)
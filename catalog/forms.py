@@ -1,6 +1,7 @@
 from django import forms
 
 from catalog.models import Product, Blog, Version, Contact
+from catalog.moderation import validate_banned_words
 
 
 class ProductForm(forms.ModelForm):
@@ -12,33 +13,15 @@ class ProductForm(forms.ModelForm):
 
     def clean_title(self):
         """ Валидация названия товара. """
-        danger_list = [
-            'казино', 'криптовалюта', 'крипта', 'биржа', 'дешево',
-            'бесплатно', 'обман', 'полиция', 'радар'
-        ]
         cleaned_data = self.cleaned_data['title']
-
-        for danger in danger_list:
-            if danger in cleaned_data.lower():
-                raise forms.ValidationError(
-                    f'Слово "{danger}" не может использоваться.'
-                )
+        validate_banned_words(cleaned_data)
 
         return cleaned_data
 
     def clean_description(self):
         """ Валидация описания товара. """
-        danger_list = [
-            'казино', 'криптовалюта', 'крипта', 'биржа', 'дешево',
-            'бесплатно', 'обман', 'полиция', 'радар'
-        ]
         cleaned_data = self.cleaned_data['description']
-
-        for danger in danger_list:
-            if danger in cleaned_data.lower():
-                raise forms.ValidationError(
-                    f'Слово "{danger}" не может использоваться.'
-                )
+        validate_banned_words(cleaned_data)
 
         return cleaned_data
 
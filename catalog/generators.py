@@ -0,0 +1,259 @@
+import random
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from catalog.models import Blog, Category, Contact, Product, Version
+from users.models import User
+
+CHUNK_SIZE = 10000  # Количество записей, генерируемых одной задачей.
+MAX_VERSIONS = 20  # Максимальное количество версий у товара.
+SKEW = 3.0  # Степень перекоса распределения (1 - равномерное).
+# Начало периода дат создания записей (фиксировано для воспроизводимости).
+START_DATE = datetime(2023, 1, 1, tzinfo=timezone.get_fixed_timezone(0))
+PERIOD = 365 * 24 * 60 * 60  # Длина периода дат создания (сек.).
+
+WORDS = (
+    'игра', 'приключение', 'стратегия', 'гонки', 'головоломка', 'шутер',
+    'симулятор', 'квест', 'аркада', 'экшен', 'ролевая', 'онлайн', 'мир',
+    'герой', 'город', 'космос', 'дракон', 'легенда', 'битва', 'тайна',
+)
+
+
+def get_rng(seed, name, chunk):
+    """
+    Возвращает генератор случайных чисел для блока записей.
+    Данные блока зависят только от seed, модели и номера блока,
+    поэтому не зависят от количества процессов и порядка выполнения.
+    """
+    return random.Random(f'{seed}:{name}:{chunk}')
+
+
+def skewed_index(rng, count, skew=SKEW):
+    """
+    Возвращает индекс от 0 до count - 1 со смещением к началу:
+    первые элементы выбираются намного чаще остальных.
+    """
+    return min(int(count * rng.random() ** skew), count - 1)
+
+
+def get_text(rng, words):
+    """ Возвращает текст из случайных слов. """
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def get_date(rng):
+    """ Возвращает случайную дату внутри периода генерации. """
+    return START_DATE + timedelta(seconds=rng.randrange(PERIOD))
+
+
+def get_next_id(model):
+    """ Возвращает первый свободный первичный ключ таблицы. """
+    return (model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0) + 1
+
+
+def copy_value(value):
+    """ Преобразует значение в текстовый формат COPY. """
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_rows(model, fields, rows):
+    """
+    Загружает строки в таблицу модели через COPY FROM STDIN.
+    Возвращает количество загруженных строк.
+    """
+    buffer = StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(copy_value(value) for value in row) + '\n')
+        count += 1
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(field).column) for field in fields)
+    sql = f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN'
+
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):  # psycopg2
+            raw_cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+    return count
+
+
+def generate_users(seed, chunk, start, stop, plan):
+    """ Генерирует пользователей с номерами от start до stop. """
+    rng = get_rng(seed, 'user', chunk)
+    first_id = plan['user']['first_id']
+    rows = []
+    for i in range(start, stop):
+        date_joined = get_date(rng)
+        rows.append((
+            first_id + i, '!', False, False, f'User {first_id + i}', '',
+            f'gen-{first_id + i}@example.com', date_joined, rng.random() < 0.95,
+        ))
+
+    return {'user': copy_rows(User, (
+        'id', 'password', 'is_superuser', 'is_staff', 'first_name', 'last_name',
+        'email', 'date_joined', 'is_active',
+    ), rows)}
+
+
+def generate_categories(seed, chunk, start, stop, plan):
+    """ Генерирует категории с номерами от start до stop. """
+    rng = get_rng(seed, 'category', chunk)
+    first_id = plan['category']['first_id']
+    rows = [
+        (first_id + i, f'Категория {first_id + i}', get_text(rng, 10))
+        for i in range(start, stop)
+    ]
+
+    return {'category': copy_rows(Category, ('id', 'title', 'description'), rows)}
+
+
+def generate_contacts(seed, chunk, start, stop, plan):
+    """ Генерирует контактные данные с номерами от start до stop. """
+    rng = get_rng(seed, 'contact', chunk)
+    rows = [
+        (f'Контакт {i}', f'+7{rng.randrange(10 ** 10):010d}',
+         f'contact-{i}@example.com', get_text(rng, rng.randint(5, 50)))
+        for i in range(start, stop)
+    ]
+
+    return {'contact': copy_rows(Contact, ('name', 'phone', 'email', 'message'), rows)}
+
+
+def generate_products(seed, chunk, start, stop, plan):
+    """
+    Генерирует товары с номерами от start до stop и их версии.
+    Большая часть товаров попадает в несколько крупных категорий
+    и к немногим продавцам, у части товаров много версий.
+    """
+    rng = get_rng(seed, 'product', chunk)
+    first_id = plan['product']['first_id']
+    categories, users = plan['category'], plan['user']
+    products, versions = [], []
+
+    for i in range(start, stop):
+        product_id = first_id + i
+        date_add = get_date(rng)
+        products.append((
+            product_id, f'Игра {product_id}', get_text(rng, rng.randint(5, 100)),
+            categories['first_id'] + skewed_index(rng, categories['count']),
+            rng.randint(100, 1000000) / 100, date_add,
+            date_add + timedelta(seconds=rng.randrange(PERIOD // 10)),
+            rng.random() < 0.9,
+            users['first_id'] + skewed_index(rng, users['count']) if users['count'] else None,
+        ))
+
+        count = min(int(rng.paretovariate(1.5)), plan['max_versions'])
+        versions.extend(
+            (product_id, f'{number}.0', f'Версия {number}', number == count)
+            for number in range(1, count + 1)
+        )
+
+    with transaction.atomic():
+        return {
+            'product': copy_rows(Product, (
+                'id', 'title', 'description', 'category', 'price',
+                'date_add', 'date_modified', 'is_published', 'creator',
+            ), products),
+            'version': copy_rows(Version, (
+                'product', 'version_number', 'title', 'is_active',
+            ), versions),
+        }
+
+
+def generate_blogs(seed, chunk, start, stop, plan):
+    """
+    Генерирует блоговые записи с номерами от start до stop.
+    Просмотры распределены с длинным хвостом: немногие записи популярны.
+    """
+    rng = get_rng(seed, 'blog', chunk)
+    first_id = plan['blog']['first_id']
+    users = plan['user']
+    rows = []
+    for i in range(start, stop):
+        blog_id = first_id + i
+        rows.append((
+            blog_id, f'Запись {blog_id}', f'gen-{blog_id}',
+            get_text(rng, rng.randint(50, 500)), get_date(rng),
+            rng.random() < 0.8, int(rng.paretovariate(1.2) * 10) - 10,
+            users['first_id'] + skewed_index(rng, users['count']) if users['count'] else None,
+        ))
+
+    return {'blog': copy_rows(Blog, (
+        'id', 'title', 'slug', 'description', 'creation_date',
+        'is_published', 'view_count', 'creator',
+    ), rows)}
+
+
+# Этапы генерации: задачи одного этапа выполняются параллельно,
+# этап начинается после того, как загружены данные предыдущего.
+GENERATORS = (
+    (('user', generate_users), ('category', generate_categories),
+     ('contact', generate_contacts)),
+    (('product', generate_products), ('blog', generate_blogs)),
+)
+
+# Модели, для которых первичные ключи назначаются при генерации.
+ID_MODELS = {'user': User, 'category': Category, 'product': Product, 'blog': Blog}
+
+
+def get_plan(counts, max_versions=MAX_VERSIONS):
+    """
+    Возвращает план генерации: количество записей по моделям
+    и первые свободные первичные ключи.
+    """
+    plan = {'max_versions': max_versions}
+    for name, count in counts.items():
+        plan[name] = {'count': count}
+        if name in ID_MODELS:
+            plan[name]['first_id'] = get_next_id(ID_MODELS[name])
+
+    return plan
+
+
+def get_tasks(plan, stage, seed, chunk_size=CHUNK_SIZE):
+    """ Разбивает этап генерации на задачи по chunk_size записей. """
+    return [
+        (generator, seed, chunk, start, min(start + chunk_size, plan[name]['count']), plan)
+        for name, generator in stage
+        for chunk, start in enumerate(range(0, plan[name]['count'], chunk_size))
+    ]
+
+
+def run_task(task):
+    """ Выполняет задачу генерации в рабочем процессе. """
+    generator, *args = task
+    try:
+        return generator(*args)
+    finally:
+        connection.close()
+
+
+def finish_generation():
+    """
+    Сдвигает последовательности первичных ключей за загруженные записи
+    и обновляет статистику планировщика по заполненным таблицам.
+    """
+    models = [User, Category, Contact, Product, Version, Blog]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+        for model in models:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
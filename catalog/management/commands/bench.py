@@ -0,0 +1,96 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.dataset import seed_dataset
+from benchmarks.runner import run_benchmarks
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочное тестирование горячих страниц каталога на отдельной
+    тестовой базе данных. Результаты сохраняются в JSON.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--versions', type=int, default=3,
+                            help='Количество версий на товар.')
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--blogs', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Количество запросов на сценарий.')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Количество параллельных клиентов.')
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Выполнять только указанные сценарии.')
+        parser.add_argument('--output', default='bench.json',
+                            help='Файл с результатами в JSON.')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Не удалять тестовую базу данных.')
+
+    def handle(self, *args, **kwargs):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False, keepdb=kwargs['keepdb'])
+        old_config = runner.setup_databases()
+        try:
+            user = seed_dataset(
+                categories=kwargs['categories'],
+                products=kwargs['products'],
+                versions=kwargs['versions'],
+                users=kwargs['users'],
+                blogs=kwargs['blogs'],
+                seed=kwargs['seed'],
+            )
+            results = run_benchmarks(
+                user,
+                requests=kwargs['requests'],
+                concurrency=kwargs['concurrency'],
+                scenarios=kwargs['scenarios'],
+            )
+        finally:
+            # Соединения реплик открыты к той же тестовой базе.
+            connections.close_all()
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        report = {
+            'commit': self.get_commit(),
+            'database': connection.vendor,
+            'cache_enabled': bool(settings.CACHE_ENABLED),
+            'dataset': {
+                name: kwargs[name]
+                for name in ('categories', 'products', 'versions', 'users', 'blogs', 'seed')
+            },
+            'requests': kwargs['requests'],
+            'concurrency': kwargs['concurrency'],
+            'results': results,
+        }
+        with open(kwargs['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<15} p50 {result["p50_ms"]:>8} мс  p95 {result["p95_ms"]:>8} мс  '
+                f'p99 {result["p99_ms"]:>8} мс  запросов {result["queries_per_request"]:>6}  '
+                f'{result["throughput_rps"]:>8} req/s  ошибок {result["errors"]}'
+            )
+        self.stdout.write(f'Результаты сохранены в {kwargs["output"]}.')
+
+    @staticmethod
+    def get_commit():
+        """ Возвращает хеш текущего коммита, если он доступен. """
+        try:
+            return subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, text=True,
+                stderr=subprocess.DEVNULL,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
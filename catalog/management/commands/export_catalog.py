@@ -0,0 +1,50 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.streaming import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS, get_export_queryset,
+                               iter_export_rows, parse_since)
+
+
+class Command(BaseCommand):
+    """ Выгружает каталог товаров в CSV или JSONL. """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv',
+                            help='Формат выгрузки.')
+        parser.add_argument('--output', default='-',
+                            help='Файл выгрузки, по умолчанию stdout.')
+        parser.add_argument('--since',
+                            help='Выгружать товары, измененные не раньше даты (ISO).')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Количество товаров, читаемых курсором за раз.')
+
+    def handle(self, *args, **kwargs):
+        try:
+            since = parse_since(kwargs['since'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        serialize, __, __ = EXPORT_FORMATS[kwargs['format']]
+        rows = iter_export_rows(get_export_queryset(since), kwargs['chunk_size'])
+        start = time.monotonic()
+        count = 0
+
+        if kwargs['output'] == '-':
+            file = sys.stdout
+        else:
+            file = open(kwargs['output'], 'w', encoding='utf-8', newline='')
+
+        try:
+            for line in serialize(rows):
+                file.write(line)
+                count += 1
+        finally:
+            if file is not sys.stdout:
+                file.close()
+
+        if kwargs['format'] == 'csv':
+            count -= 1  # Строка заголовка.
+        elapsed = time.monotonic() - start
+        self.stderr.write(f'Выгружено товаров: {count} за {elapsed:.2f} с.')
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from catalog.services import flush_view_counts
+
+
+class Command(BaseCommand):
+    """ Переносит накопленные просмотры блоговых записей в базу данных. """
+
+    def handle(self, *args, **kwargs):
+        try:
+            flushed = flush_view_counts()
+            print(f'Обновлено записей: {flushed}.')
+        except Exception as e:
+            print(f'Не удалось перенести просмотры записей. '
+                  f'Ошибка {str(e)}.')
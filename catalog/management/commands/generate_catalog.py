@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from catalog.generators import (CHUNK_SIZE, GENERATORS, MAX_VERSIONS, finish_generation,
+                                get_plan, get_tasks, run_task)
+from catalog.services import bump_cache_generation
+
+
+class Command(BaseCommand):
+    """
+    Заполняет базу данных синтетическим каталогом большого объема:
+    пользователи, категории, товары с версиями, блог и контакты.
+    При одинаковых seed и размере блока данные совпадают.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000,
+                            help='Количество пользователей.')
+        parser.add_argument('--categories', type=int, default=50,
+                            help='Количество категорий.')
+        parser.add_argument('--products', type=int, default=100000,
+                            help='Количество товаров.')
+        parser.add_argument('--max-versions', type=int, default=MAX_VERSIONS,
+                            help='Максимальное количество версий у товара.')
+        parser.add_argument('--blogs', type=int, default=10000,
+                            help='Количество блоговых записей.')
+        parser.add_argument('--contacts', type=int, default=1000,
+                            help='Количество контактных данных.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Начальное значение генератора случайных чисел.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Количество записей, генерируемых одной задачей.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Количество рабочих процессов.')
+
+    def handle(self, *args, **kwargs):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Генерация каталога поддерживается только для PostgreSQL.')
+        if kwargs['products'] and not kwargs['categories']:
+            raise CommandError('Для генерации товаров нужна хотя бы одна категория.')
+
+        plan = get_plan({
+            'user': kwargs['users'],
+            'category': kwargs['categories'],
+            'contact': kwargs['contacts'],
+            'product': kwargs['products'],
+            'blog': kwargs['blogs'],
+        }, kwargs['max_versions'])
+
+        start = time.monotonic()
+        totals = Counter()
+        # Рабочие процессы создаются через fork и не должны
+        # наследовать открытые соединения с базой данных.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+
+        with ProcessPoolExecutor(kwargs['workers'], mp_context=context) as executor:
+            for stage in GENERATORS:
+                stage_start = time.monotonic()
+                tasks = get_tasks(plan, stage, kwargs['seed'], kwargs['chunk_size'])
+                for result in executor.map(run_task, tasks):
+                    totals.update(result)
+                names = ', '.join(name for name, __ in stage)
+                self.stdout.write(f'Этап ({names}): {time.monotonic() - stage_start:.2f} с.')
+
+        finish_generation()
+        if settings.CACHE_ENABLED:
+            bump_cache_generation('category')
+
+        elapsed = time.monotonic() - start
+        total = sum(totals.values())
+        for name, count in totals.items():
+            self.stdout.write(f'{name}: {count}')
+        self.stdout.write(
+            f'Создано записей: {total} за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-6):.0f} записей/с).'
+        )
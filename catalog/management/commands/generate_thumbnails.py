@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from catalog.thumbnails import THUMBNAIL_FIELDS, create_thumbnails
+
+
+class Command(BaseCommand):
+    """ Создает уменьшенные копии для всех загруженных изображений. """
+
+    def handle(self, *args, **kwargs):
+        created = 0
+        for model_name, field_name, size_name in THUMBNAIL_FIELDS:
+            model = apps.get_model(model_name)
+            image_names = (
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+                .distinct()
+                .iterator()
+            )
+            for image_name in image_names:
+                try:
+                    created += len(create_thumbnails(image_name, size_name))
+                except (OSError, ValueError) as e:
+                    print(f'Не удалось обработать изображение {image_name}. '
+                          f'Ошибка {str(e)}.')
+
+        print(f'Создано уменьшенных копий: {created}.')
@@ -1,20 +1,74 @@
-import json
+import time
 
-from catalog.models import Category
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
 
+from catalog.models import Category
+from catalog.services import bump_cache_generation
+from catalog.streaming import iter_json_records, iter_batches
 from config.settings import CATEGORY_FILE
-from django.core.management.base import BaseCommand
 
 
 class Command(BaseCommand):
-    """ Загружает данные из фикстуры в таблицу категорий. """
+    """
+    Загружает данные из фикстуры (JSON-массив или JSONL)
+    в таблицу категорий пакетами.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=CATEGORY_FILE,
+                            help='Файл с категориями (JSON-массив или JSONL).')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Количество записей в одной вставке.')
+        parser.add_argument('--upsert', action='store_true',
+                            help='Обновлять существующие категории по названию.')
 
     def handle(self, *args, **kwargs):
-        with open(CATEGORY_FILE, encoding='utf-8') as file:
-            data = json.load(file)
-            for category in data:
-                Category.objects.create(
-                    title=category['fields']['title'],
-                    description=category['fields'].get('description', 'Описание'),
-                    image=category['fields'].get('image', None),
-                )
+        start = time.monotonic()
+        created = updated = 0
+
+        with open(kwargs['file'], encoding='utf-8') as file:
+            records = iter_json_records(file)
+            for batch in iter_batches(records, kwargs['batch_size']):
+                categories = [
+                    Category(
+                        title=category['fields']['title'],
+                        description=category['fields'].get('description', 'Описание'),
+                        image=category['fields'].get('image', None),
+                    )
+                    for category in batch
+                ]
+                with transaction.atomic():
+                    if kwargs['upsert']:
+                        updated += self.update_existing(categories)
+                    created += len(Category.objects.bulk_create(categories))
+
+        if settings.CACHE_ENABLED:
+            bump_cache_generation('category')
+
+        elapsed = time.monotonic() - start
+        total = created + updated
+        self.stdout.write(
+            f'Создано категорий: {created}, обновлено: {updated} '
+            f'за {elapsed:.2f} с ({total / max(elapsed, 1e-6):.0f} записей/с).'
+        )
+
+    @staticmethod
+    def update_existing(categories):
+        """
+        Обновляет уже существующие категории пакета по названию
+        и оставляет в списке только новые. Возвращает число обновленных.
+        """
+        existing = dict(
+            Category.objects.filter(
+                title__in=[category.title for category in categories]
+            ).values_list('title', 'pk')
+        )
+        to_update = [category for category in categories if category.title in existing]
+        for category in to_update:
+            category.pk = existing[category.title]
+        categories[:] = [category for category in categories if category.title not in existing]
+
+        Category.objects.bulk_update(to_update, ['description', 'image'])
+        return len(to_update)
@@ -1,26 +1,99 @@
-from django.core.management.base import BaseCommand
+import time
 
-from config.settings import PRODUCT_FILE
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
 
 from catalog.models import Product, Category
-
-import json
+from catalog.streaming import dedupe_last, iter_json_records, iter_batches
+from config.settings import PRODUCT_FILE
 
 
 class Command(BaseCommand):
-    """ Загружает данные из фикстуры в таблицу товаров. """
+    """
+    Загружает данные из фикстуры (JSON-массив или JSONL)
+    в таблицу товаров пакетами.
+    """
+    update_fields = ('description', 'image', 'price', 'date_modified')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=PRODUCT_FILE,
+                            help='Файл с товарами (JSON-массив или JSONL).')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Количество записей в одной вставке.')
+        parser.add_argument('--upsert', action='store_true',
+                            help='Обновлять существующие товары '
+                                 'по названию и категории.')
 
     def handle(self, *args, **kwargs):
-        with open(PRODUCT_FILE, encoding='utf-8') as file:
-            data = json.load(file)
-            for product in data:
-                category = Category.objects.get(id=product['fields']['category'])
-                Product.objects.create(
-                    title=product['fields']['title'],
-                    description=product['fields']['description'],
-                    category=category,
-                    image=product['fields']['image'],
-                    price=product['fields']['price'],
-                    date_add=product['fields']['date_add'],
-                    date_modified=product['fields']['date_modified'],
-                )
+        start = time.monotonic()
+        created = updated = skipped = 0
+        # Загружаем идентификаторы категорий одним запросом.
+        category_ids = set(Category.objects.values_list('id', flat=True))
+
+        with open(kwargs['file'], encoding='utf-8') as file:
+            records = iter_json_records(file)
+            for batch in iter_batches(records, kwargs['batch_size']):
+                products = []
+                for product in batch:
+                    if product['fields']['category'] not in category_ids:
+                        skipped += 1
+                        continue
+                    products.append(Product(
+                        title=product['fields']['title'],
+                        description=product['fields']['description'],
+                        category_id=product['fields']['category'],
+                        image=product['fields']['image'],
+                        price=product['fields']['price'],
+                        date_add=product['fields']['date_add'],
+                        date_modified=product['fields']['date_modified'],
+                    ))
+                with transaction.atomic():
+                    if kwargs['upsert']:
+                        # Повторы товара в пакете: побеждает последняя запись.
+                        products = dedupe_last(products, self.get_key)
+                        updated += self.update_existing(products)
+                    created += len(Product.objects.bulk_create(products))
+
+        elapsed = time.monotonic() - start
+        total = created + updated
+        self.stdout.write(
+            f'Создано товаров: {created}, обновлено: {updated}, '
+            f'пропущено без категории: {skipped} '
+            f'за {elapsed:.2f} с ({total / max(elapsed, 1e-6):.0f} записей/с).'
+        )
+
+    @staticmethod
+    def get_key(product):
+        """ Возвращает ключ товара при обновлении: название и категория. """
+        return product.title, product.category_id
+
+    def update_existing(self, products):
+        """
+        Обновляет уже существующие товары пакета по названию и категории
+        и оставляет в списке только новые. Возвращает число обновленных.
+        """
+        existing = {
+            (title, category_id): pk
+            for pk, title, category_id in Product.objects.filter(
+                title__in={product.title for product in products},
+                category_id__in={product.category_id for product in products},
+            ).values_list('pk', 'title', 'category_id')
+        }
+        to_update = [
+            product for product in products
+            if (product.title, product.category_id) in existing
+        ]
+        # bulk_update не обновляет auto_now: время изменения сбрасывает
+        # валидаторы и кэш страниц обновленных товаров.
+        now = timezone.now()
+        for product in to_update:
+            product.pk = existing[(product.title, product.category_id)]
+            product.date_modified = now
+        products[:] = [
+            product for product in products
+            if (product.title, product.category_id) not in existing
+        ]
+
+        Product.objects.bulk_update(to_update, self.update_fields)
+        return len(to_update)
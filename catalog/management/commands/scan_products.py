@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalog.models import Product
+from catalog.moderation import compile_banned_words, find_banned_words, get_banned_words
+from catalog.streaming import EXPORT_CHUNK_SIZE, iter_batches
+
+
+class Command(BaseCommand):
+    """
+    Проверяет весь каталог товаров на запрещенные слова
+    и выводит найденные товары. Товары читаются курсором.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Количество товаров, читаемых курсором за раз.')
+        parser.add_argument('--unpublish', action='store_true',
+                            help='Снимать найденные товары с публикации.')
+
+    def handle(self, *args, **kwargs):
+        start = time.monotonic()
+        pattern = compile_banned_words(get_banned_words())
+        scanned = 0
+        flagged = []
+
+        products = Product.objects.order_by('pk').values_list('pk', 'title', 'description')
+        for pk, title, description in products.iterator(chunk_size=kwargs['chunk_size']):
+            scanned += 1
+            found = find_banned_words(title, pattern) + find_banned_words(description, pattern)
+            if found:
+                flagged.append(pk)
+                self.stdout.write(f'{pk}: {title} - {", ".join(dict.fromkeys(found))}')
+
+        if kwargs['unpublish'] and flagged:
+            for batch in iter_batches(flagged, kwargs['chunk_size']):
+                # Время изменения сбрасывает валидаторы и кэш страниц товаров.
+                Product.objects.filter(pk__in=batch).update(
+                    is_published=False, date_modified=timezone.now()
+                )
+
+        elapsed = time.monotonic() - start
+        self.stderr.write(
+            f'Проверено товаров: {scanned}, найдено с запрещенными словами: '
+            f'{len(flagged)} за {elapsed:.2f} с ({scanned / max(elapsed, 1e-6):.0f} товаров/с).'
+        )
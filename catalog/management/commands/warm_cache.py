@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.warmup import PAGES, WORKERS, warm_cache
+
+
+class Command(BaseCommand):
+    """
+    Прогревает кэш и базу данных перед приемом запросов:
+    категории, список категорий, права и группы пользователей,
+    главную страницу и первые страницы крупнейших категорий.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=PAGES,
+                            help='Количество категорий, первые страницы которых прогреваются.')
+        parser.add_argument('--workers', type=int, default=WORKERS,
+                            help='Количество потоков прогрева.')
+
+    def handle(self, *args, **kwargs):
+        start = time.perf_counter()
+        report = warm_cache(pages=kwargs['pages'], workers=kwargs['workers'])
+
+        for name, stats in report.items():
+            self.stdout.write(
+                f'{name}: задач {stats["tasks"]}, ключей {stats["keys"]}, '
+                f'записей {stats["rows"]}, {stats["seconds"]:.2f} с.'
+            )
+        keys = sum(stats['keys'] for stats in report.values())
+        self.stdout.write(
+            f'Прогрев выполнен за {time.perf_counter() - start:.2f} с, ключей кэша: {keys}.'
+        )
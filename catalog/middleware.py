@@ -0,0 +1,271 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from catalog.routers import has_written, use_primary
+
+logger = logging.getLogger('catalog.metrics')
+
+
+# Показатели пула соединений, попадающие в метрики запроса.
+POOL_STATS = ('pool_min', 'pool_max', 'pool_size', 'pool_available',
+              'requests_waiting', 'requests_num', 'requests_wait_ms', 'requests_errors')
+
+
+def get_pool_stats():
+    """
+    Возвращает использование пулов соединений psycopg 3 процесса
+    по базам данных: размер, свободные и ожидающие соединения.
+    """
+    stats = {}
+    for connection in connections.all():
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            pool_stats = pool.get_stats()
+            stats[connection.alias] = {name: pool_stats.get(name, 0) for name in POOL_STATS}
+
+    return stats
+
+
+class QueryBudgetExceeded(Exception):
+    """ Представление выполнило больше SQL-запросов, чем разрешено. """
+
+
+class QueryRecorder:
+    """ Обертка выполнения SQL: считает запросы, время и повторы. """
+
+    def __init__(self):
+        self.count = 0  # Количество запросов.
+        self.duration = 0.0  # Суммарное время запросов (сек.).
+        self.fingerprints = Counter()  # Количество запросов по тексту SQL.
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[sql] += 1
+
+    def get_duplicates(self, limit=5):
+        """ Возвращает самые частые повторяющиеся запросы. """
+        return [
+            (sql, count) for sql, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+
+def render_page(request, response):
+    """
+    Рендерит ответ для кэша страниц. Такой ответ не проходит через
+    process_template_response, поэтому время рендеринга и промах
+    кэша отмечаются в метриках запроса здесь.
+    """
+    request.page_cache = 'miss'
+    start = time.perf_counter()
+    content = response.render().content
+    if hasattr(request, 'template_render_time'):
+        request.template_render_time += time.perf_counter() - start
+
+    return content
+
+
+class RequestMetricsMiddleware:
+    """
+    Собирает метрики запроса: количество и время SQL-запросов,
+    повторяющиеся запросы, время рендеринга шаблонов и
+    использование пула соединений.
+    Отдает их в заголовке Server-Timing и в лог, проверяет
+    бюджеты запросов QUERY_BUDGETS по имени URL.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        request.template_render_time = 0.0
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            self.wrap_connections(stack, recorder)
+            response = self.get_response(request)
+
+        return self.finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        """ Асинхронная версия __call__ для ASGI. """
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        request.template_render_time = 0.0
+        start = time.perf_counter()
+
+        # Асинхронный ORM выполняет запросы в синхронном потоке запроса
+        # со своими соединениями, обертки подключаются в этом потоке.
+        stack = ExitStack()
+        await sync_to_async(self.wrap_connections)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        return self.finish(request, response, recorder, start)
+
+    @staticmethod
+    def wrap_connections(stack, recorder):
+        """ Подключает счетчик запросов ко всем базам данных. """
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def finish(self, request, response, recorder, start):
+        """ Добавляет метрики к ответу, пишет их в лог и проверяет бюджет. """
+        total = time.perf_counter() - start
+        # Страница из кэша не рендерится: время шаблона не показываем.
+        page_cache = getattr(request, 'page_cache', None)
+        template_ms = None if page_cache == 'hit' else round(request.template_render_time * 1000, 1)
+        timings = [f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"']
+        if template_ms is not None:
+            timings.append(f'tpl;dur={template_ms:.1f}')
+        if page_cache:
+            timings.append(f'cache;desc={page_cache}')
+        timings.append(f'total;dur={total * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        logger.info(json.dumps({
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 1),
+            'template_ms': template_ms,
+            'page_cache': page_cache,
+            'total_ms': round(total * 1000, 1),
+            'duplicates': recorder.get_duplicates(),
+            'db_pool': get_pool_stats(),
+        }, ensure_ascii=False))
+
+        self.check_budget(view_name, recorder)
+
+        return response
+
+    def process_template_response(self, request, response):
+        """ Замеряет время рендеринга шаблона ответа. """
+        if not hasattr(request, 'template_render_time'):
+            return response
+
+        start = time.perf_counter()
+
+        def stop(rendered_response):
+            request.template_render_time += time.perf_counter() - start
+
+        response.add_post_render_callback(stop)
+        return response
+
+    @staticmethod
+    def check_budget(view_name, recorder):
+        """
+        Проверяет бюджет запросов представления: пишет предупреждение
+        в лог или, при QUERY_BUDGET_RAISE, вызывает исключение.
+        """
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or recorder.count <= budget:
+            return
+
+        message = (f'Представление {view_name} выполнило {recorder.count} '
+                   f'SQL-запросов при бюджете {budget}.')
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class PrimaryStickinessMiddleware:
+    """
+    Закрепляет чтение за основной базой данных на время
+    REPLICA_STICKINESS после записи пользователя. Время окончания
+    закрепления хранится в cookie.
+    """
+    cookie_name = 'db_primary_until'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')  # Методы, которые могут читать с реплик.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+            self.set_cookie(response)
+        finally:
+            self.reset(tokens)
+
+        return response
+
+    async def __acall__(self, request):
+        """ Асинхронная версия __call__ для ASGI. """
+        tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+            self.set_cookie(response)
+        finally:
+            self.reset(tokens)
+
+        return response
+
+    def start(self, request):
+        """
+        Закрепляет чтение за основной базой по cookie запроса.
+        Изменяющие запросы читают с основной базы с самого начала,
+        чтобы формы не сохраняли устаревшие данные реплики.
+        """
+        try:
+            sticky = float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            sticky = False
+        if request.method not in self.safe_methods:
+            sticky = True
+
+        return use_primary.set(sticky), has_written.set(False)
+
+    def set_cookie(self, response):
+        """ Продлевает закрепление, если запрос изменял данные. """
+        if has_written.get():
+            response.set_cookie(
+                self.cookie_name,
+                str(time.time() + settings.REPLICA_STICKINESS),
+                max_age=settings.REPLICA_STICKINESS,
+                httponly=True,
+                samesite='Lax',
+            )
+
+    @staticmethod
+    def reset(tokens):
+        """ Снимает закрепление после обработки запроса. """
+        primary_token, written_token = tokens
+        use_primary.reset(primary_token)
+        has_written.reset(written_token)
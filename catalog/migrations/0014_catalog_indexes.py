@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:08
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицы,
+    # но не может выполняться внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('catalog', '0013_bannedword'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='blog',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-creation_date', '-id'], name='blog_published_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', 'date_add', 'id'], name='product_published_category_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='version',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['product'], name='version_active_product_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+from pytils.translit import slugify
+
+
+def make_unique_slugs(apps, schema_editor):
+    """ Заполняет пустые и повторяющиеся slug записей блога. """
+    Blog = apps.get_model('catalog', 'Blog')
+    taken = set()
+    for blog in Blog.objects.order_by('pk').only('pk', 'title', 'slug').iterator():
+        base = blog.slug or slugify(blog.title)[:140].strip('-') or 'blog'
+        slug, number = base, 1
+        while slug in taken:
+            number += 1
+            slug = f'{base}-{number}'
+        taken.add(slug)
+        if slug != blog.slug:
+            Blog.objects.filter(pk=blog.pk).update(slug=slug)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0014_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogRedirect',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_slug', models.CharField(max_length=150, unique=True, verbose_name='Прежний slug')),
+            ],
+            options={
+                'verbose_name': 'Прежний адрес записи',
+                'verbose_name_plural': 'Прежние адреса записей',
+            },
+        ),
+        migrations.RunPython(make_unique_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='blog',
+            name='slug',
+            field=models.CharField(blank=True, max_length=150, unique=True, verbose_name='Slug'),
+        ),
+        migrations.AddField(
+            model_name='blogredirect',
+            name='blog',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.blog', verbose_name='Блоговая запись'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0015_blog_unique_slug'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='product',
+            options={'permissions': [('cancel_published_status', 'Может отменять публикацию товара'), ('change_description', 'Может менять описание товара'), ('change_category', 'Может менять категорию товара'), ('export_product', 'Может выгружать каталог товаров')], 'verbose_name': 'Товар', 'verbose_name_plural': 'Товары'},
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+# Вектор пересчитывается только при изменении названия или описания,
+# а не при каждом обновлении товара (date_modified, публикация).
+UPDATE_OF_COLUMNS_SQL = """
+DROP TRIGGER IF EXISTS catalog_product_search_vector_trigger ON catalog_product;
+CREATE TRIGGER catalog_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON catalog_product
+    FOR EACH ROW EXECUTE FUNCTION catalog_product_search_vector_update();
+"""
+
+UPDATE_ANY_SQL = """
+DROP TRIGGER IF EXISTS catalog_product_search_vector_trigger ON catalog_product;
+CREATE TRIGGER catalog_product_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON catalog_product
+    FOR EACH ROW EXECUTE FUNCTION catalog_product_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0016_product_export_permission'),
+    ]
+
+    operations = [
+        migrations.RunSQL(UPDATE_OF_COLUMNS_SQL, UPDATE_ANY_SQL),
+    ]
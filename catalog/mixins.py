@@ -0,0 +1,321 @@
+import asyncio
+import base64
+import hashlib
+import json
+
+from django.contrib.auth.mixins import AccessMixin, PermissionRequiredMixin
+from django.db.models import Q
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class KeysetPage:
+    """ Страница курсорной пагинации. """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list  # Записи страницы.
+        self.next_cursor = next_cursor  # Курсор следующей страницы.
+        self.previous_cursor = previous_cursor  # Курсор предыдущей страницы.
+
+    def has_next(self):
+        """ Есть ли следующая страница. """
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        """ Есть ли предыдущая страница. """
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        """ Есть ли другие страницы. """
+        return self.has_next() or self.has_previous()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginationMixin:
+    """
+    Курсорная пагинация для ListView по полям cursor_fields.
+    Страницы выбираются условием по ключу вместо OFFSET и без COUNT(*),
+    курсоры передаются в параметрах after и before.
+    """
+    paginate_by = 20  # Количество записей на странице.
+    cursor_fields = ('id',)  # Поля курсора, последнее должно быть уникальным.
+
+    def get_ordering(self):
+        """ Сортирует записи по полям курсора. """
+        return self.cursor_fields
+
+    def encode_cursor(self, obj):
+        """ Кодирует значения полей курсора объекта в строку. """
+        values = [
+            getattr(obj, name.lstrip('-')) for name in self.cursor_fields
+        ]
+        data = json.dumps(values, default=str).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, cursor):
+        """ Декодирует строку курсора в значения полей. """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.cursor_fields):
+                raise ValueError
+            return [
+                self.model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(self.cursor_fields, values)
+            ]
+        except Exception:
+            raise Http404('Неверный курсор страницы.')
+
+    def get_cursor_filter(self, values, reverse=False):
+        """
+        Возвращает условие на записи, идущие после курсора
+        (или перед ним при reverse=True) в порядке cursor_fields.
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.cursor_fields, values):
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        return condition
+
+    def get_page_queryset(self, queryset):
+        """ Ограничивает записи курсором из запроса и сортирует их. """
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+
+        if before:
+            reversed_ordering = [
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in self.cursor_fields
+            ]
+            queryset = queryset.filter(
+                self.get_cursor_filter(self.decode_cursor(before), reverse=True)
+            ).order_by(*reversed_ordering)
+        elif after:
+            queryset = queryset.filter(
+                self.get_cursor_filter(self.decode_cursor(after))
+            )
+
+        return queryset
+
+    def make_page(self, object_list, page_size):
+        """
+        Собирает страницу из записей, выбранных с одной лишней записью,
+        и возвращает результат в формате paginate_queryset.
+        """
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        has_more = len(object_list) > page_size
+        object_list = object_list[:page_size]
+
+        if before:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(after)
+
+        page = KeysetPage(object_list)
+        if object_list and has_next:
+            page.next_cursor = self.encode_cursor(object_list[-1])
+        if object_list and has_previous:
+            page.previous_cursor = self.encode_cursor(object_list[0])
+
+        return None, page, object_list, page.has_other_pages()
+
+    def paginate_queryset(self, queryset, page_size):
+        """ Возвращает страницу записей по курсору из запроса. """
+        queryset = self.get_page_queryset(queryset)
+        # Берем на одну запись больше, чтобы узнать о следующей странице.
+        return self.make_page(list(queryset[:page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """ Асинхронная версия paginate_queryset. """
+        queryset = self.get_page_queryset(queryset)
+        object_list = [obj async for obj in queryset[:page_size + 1]]
+        return self.make_page(object_list, page_size)
+
+
+def check_conditions(request, parts, last_modified):
+    """
+    Вычисляет ETag и Last-Modified страницы по валидаторам.
+    Возвращает их и ответ 304/412, если страница у клиента актуальна.
+    """
+    value = '-'.join(str(part) for part in parts)
+    etag = quote_etag(hashlib.md5(value.encode()).hexdigest())
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    return etag, timestamp, response
+
+
+def set_validators(response, etag, timestamp):
+    """ Добавляет валидаторы к успешному ответу. """
+    if response.status_code == 200:
+        response.headers.setdefault('ETag', etag)
+        if timestamp is not None:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы (ETag, Last-Modified): если страница
+    не изменилась, возвращает 304 без построения контекста и шаблонов.
+    Подключается после миксинов проверки прав, чтобы валидаторы
+    считались только для допущенных пользователей.
+    """
+
+    def get_validators(self):
+        """
+        Возвращает составные части ETag и время последнего
+        изменения страницы (или None, если их нельзя вычислить).
+        """
+        return None, None
+
+    def dispatch(self, request, *args, **kwargs):
+        """ Отвечает 304, если страница у клиента актуальна. """
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+
+        parts, last_modified = self.get_validators()
+        if parts is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, timestamp, response = check_conditions(request, parts, last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            set_validators(response, etag, timestamp)
+        # Страница зависит от роли пользователя и не должна попадать в общий кэш.
+        patch_cache_control(response, private=True)
+
+        return response
+
+
+class AsyncUserMixin:
+    """
+    Загружает пользователя запроса асинхронно до обработки запроса:
+    ленивый request.user нельзя вычислить внутри цикла событий.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """ Загружает пользователя и обрабатывает запрос. """
+        request.user = await request.auser()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncConditionalGetMixin:
+    """ Асинхронная версия ConditionalGetMixin для async-представлений. """
+
+    async def aget_validators(self):
+        """ Асинхронная версия get_validators. """
+        return None, None
+
+    async def dispatch(self, request, *args, **kwargs):
+        """ Отвечает 304, если страница у клиента актуальна. """
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+
+        parts, last_modified = await self.aget_validators()
+        if parts is None:
+            return await super().dispatch(request, *args, **kwargs)
+
+        etag, timestamp, response = check_conditions(request, parts, last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+            set_validators(response, etag, timestamp)
+        # Страница зависит от роли пользователя и не должна попадать в общий кэш.
+        patch_cache_control(response, private=True)
+
+        return response
+
+
+class ObjectPermissionRequiredMixin(PermissionRequiredMixin):
+    """
+    Проверка прав на объект: доступ есть у владельца объекта
+    или у пользователя с разрешениями permission_required.
+    Объект загружается один раз за запрос вместе со связанными
+    моделями и используется и проверкой прав, и представлением.
+    """
+    owner_field = 'creator'  # Поле владельца объекта.
+    object_select_related = ('creator',)  # Связанные модели объекта.
+
+    def get_queryset(self):
+        """ Возвращает записи вместе со связанными моделями. """
+        return super().get_queryset().select_related(*self.object_select_related)
+
+    def get_object(self, queryset=None):
+        """ Возвращает объект, загруженный при первом обращении. """
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, 'checked_object'):
+            self.checked_object = super().get_object()
+        return self.checked_object
+
+    def is_owner(self, obj):
+        """ Является ли текущий пользователь владельцем объекта. """
+        owner_id = getattr(obj, f'{self.owner_field}_id')
+        return owner_id is not None and owner_id == self.request.user.pk
+
+    def has_permission(self):
+        """ Владелец объекта или пользователь с необходимыми правами. """
+        obj = self.get_object()
+        return self.is_owner(obj) or super().has_permission()
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """ Асинхронная версия LoginRequiredMixin. """
+
+    async def dispatch(self, request, *args, **kwargs):
+        """ Перенаправляет анонимного пользователя на страницу входа. """
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncObjectPermissionRequiredMixin(AccessMixin):
+    """ Асинхронная версия ObjectPermissionRequiredMixin. """
+    permission_required = ()  # Разрешения на просмотр объекта.
+    owner_field = 'creator'  # Поле владельца объекта.
+    object_select_related = ('creator',)  # Связанные модели объекта.
+
+    def get_queryset(self):
+        """ Возвращает записи вместе со связанными моделями. """
+        return super().get_queryset().select_related(*self.object_select_related)
+
+    async def aget_object(self):
+        """ Асинхронная версия get_object, объект загружается один раз. """
+        if not hasattr(self, 'checked_object'):
+            try:
+                self.checked_object = await self.get_queryset().aget(pk=self.kwargs.get('pk'))
+            except self.model.DoesNotExist:
+                raise Http404('Объект не найден.')
+        return self.checked_object
+
+    def is_owner(self, obj):
+        """ Является ли текущий пользователь владельцем объекта. """
+        owner_id = getattr(obj, f'{self.owner_field}_id')
+        return owner_id is not None and owner_id == self.request.user.pk
+
+    async def ahas_permission(self):
+        """
+        Владелец объекта или пользователь с необходимыми правами.
+        Объект и права пользователя загружаются одновременно.
+        """
+        obj, has_perms = await asyncio.gather(
+            self.aget_object(), self.request.user.ahas_perms(self.permission_required)
+        )
+        return self.is_owner(obj) or has_perms
+
+    async def dispatch(self, request, *args, **kwargs):
+        """ Проверяет права до обработки запроса. """
+        if not await self.ahas_permission():
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
@@ -1,7 +1,10 @@
 from typing import Optional
 
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
+from pytils.translit import slugify
 
 NULLABLE = {'blank': True, 'null': True}
 
@@ -23,9 +26,17 @@ class Product(models.Model):
         on_delete=models.SET_NULL,
         **NULLABLE,
         verbose_name='Продавец')
+    # Поисковый вектор (название и описание), заполняется триггером в базе.
+    search_vector = SearchVectorField(editable=False, **NULLABLE)
 
     @property
     def active_version(self) -> Optional['Version']:
+        """
+        Возвращает активную версию товара.
+        Использует предзагруженные версии (active_versions), если они есть.
+        """
+        if hasattr(self, 'active_versions'):
+            return self.active_versions[-1] if self.active_versions else None
         return self.version_set.filter(is_active=True).last()
 
     def __str__(self) -> str:
@@ -36,11 +47,21 @@ class Product(models.Model):
         """ Метаданные для модели товара. """
         verbose_name = 'Товар'
         verbose_name_plural = 'Товары'
+        indexes = [
+            GinIndex(fields=['search_vector'], name='product_search_vector_idx'),
+            # Опубликованные товары категории в порядке пагинации.
+            models.Index(
+                fields=['category', 'date_add', 'id'],
+                condition=models.Q(is_published=True),
+                name='product_published_category_idx',
+            ),
+        ]
 
         permissions = [
             ('cancel_published_status', 'Может отменять публикацию товара'),
             ('change_description', 'Может менять описание товара'),
             ('change_category', 'Может менять категорию товара'),
+            ('export_product', 'Может выгружать каталог товаров'),
         ]
 
 
@@ -98,12 +119,20 @@ class Version(models.Model):
         """ Метаданные для модели контактных данных. """
         verbose_name = 'Версия'
         verbose_name_plural = 'Версии'
+        indexes = [
+            # Активная версия товара.
+            models.Index(
+                fields=['product'],
+                condition=models.Q(is_active=True),
+                name='version_active_product_idx',
+            ),
+        ]
 
 
 class Blog(models.Model):
     """ Модель блоговой записи. """
     title = models.CharField(max_length=150, verbose_name='Заголовок')
-    slug = models.CharField(max_length=150, verbose_name='Slug', **NULLABLE)
+    slug = models.CharField(max_length=150, unique=True, blank=True, verbose_name='Slug')
     description = models.TextField(verbose_name='Содержимое', **NULLABLE)
     preview = models.ImageField(
         upload_to='images/blog/',
@@ -127,7 +156,118 @@ class Blog(models.Model):
         """ Возвращает строковое представление о классе блога. """
         return f'{self.title}'
 
+    def get_slug_base(self):
+        """ Возвращает slug по заголовку записи без суффикса. """
+        # Оставляем место для суффикса при совпадении.
+        return slugify(self.title)[:140].strip('-') or 'blog'
+
+    def has_slug_for_title(self):
+        """ Соответствует ли текущий slug заголовку записи. """
+        base = self.get_slug_base()
+        suffix = (self.slug or '')[len(base) + 1:]
+        return self.slug == base or (
+            self.slug.startswith(f'{base}-') and suffix.isdigit()
+        )
+
+    def get_unique_slug(self):
+        """
+        Возвращает свободный slug по заголовку записи: при совпадении
+        со slug другой записи или ее прежним адресом добавляет суффикс.
+        """
+        base = self.get_slug_base()
+        taken = set(Blog.objects.filter(slug__startswith=base).exclude(
+            pk=self.pk).values_list('slug', flat=True))
+        taken.update(BlogRedirect.objects.filter(old_slug__startswith=base).exclude(
+            blog_id=self.pk).values_list('old_slug', flat=True))
+
+        slug, number = base, 1
+        while slug in taken:
+            number += 1
+            slug = f'{base}-{number}'
+
+        return slug
+
+    def is_slug_taken(self):
+        """ Проверяет, занят ли slug записи другой записью или перенаправлением. """
+        return (Blog.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                or BlogRedirect.objects.filter(old_slug=self.slug).exclude(
+                    blog_id=self.pk).exists())
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет запись с уникальным slug по заголовку.
+        При изменении заголовка прежний slug сохраняется
+        как адрес перенаправления на запись.
+        """
+        update_fields = kwargs.get('update_fields')
+        if self.slug and (self.has_slug_for_title() or (
+                update_fields is not None and 'title' not in update_fields)):
+            return super().save(*args, **kwargs)
+
+        old_slug = self.slug
+        for attempt in range(3):
+            self.slug = self.get_unique_slug()
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                    if old_slug and old_slug != self.slug:
+                        BlogRedirect.objects.update_or_create(
+                            old_slug=old_slug, defaults={'blog': self})
+                    BlogRedirect.objects.filter(old_slug=self.slug).delete()
+                return
+            except IntegrityError:
+                # Повторяем, только если slug заняла параллельно сохраненная
+                # запись, другие нарушения ограничений не связаны со slug.
+                if attempt == 2 or not self.is_slug_taken():
+                    raise
+
     class Meta:
         """ Метаданные для модели блога. """
         verbose_name = 'Блоговая запись'
         verbose_name_plural = 'Блоговые записи'
+        indexes = [
+            # Опубликованные записи в порядке пагинации.
+            models.Index(
+                fields=['-creation_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='blog_published_date_idx',
+            ),
+        ]
+
+
+class BannedWord(models.Model):
+    """ Модель запрещенного слова для модерации товаров. """
+    term = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Слово или основа слова'
+    )
+    is_active = models.BooleanField(default=True, verbose_name='Активно')
+
+    def __str__(self) -> str:
+        """ Возвращает строковое представление о классе запрещенного слова. """
+        return f'{self.term}'
+
+    class Meta:
+        """ Метаданные для модели запрещенного слова. """
+        verbose_name = 'Запрещенное слово'
+        verbose_name_plural = 'Запрещенные слова'
+
+
+class BlogRedirect(models.Model):
+    """ Модель прежнего адреса (slug) блоговой записи. """
+    old_slug = models.CharField(max_length=150, unique=True, verbose_name='Прежний slug')
+    blog = models.ForeignKey(
+        'catalog.Blog',
+        on_delete=models.CASCADE,
+        verbose_name='Блоговая запись'
+    )
+
+    def __str__(self) -> str:
+        """ Возвращает строковое представление о классе перенаправления. """
+        return f'{self.old_slug} -> {self.blog_id}'
+
+    class Meta:
+        """ Метаданные для модели перенаправления блоговой записи. """
+        verbose_name = 'Прежний адрес записи'
+        verbose_name_plural = 'Прежние адреса записей'
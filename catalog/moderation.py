@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.forms import ValidationError
+
+from catalog.caching import cached
+from catalog.models import BannedWord
+from catalog.services import make_cache_key
+
+
+def get_banned_words():
+    """
+    Возвращает запрещенные слова и основы слов из настроек
+    (BANNED_WORDS) и базы данных. Список из базы кэшируется.
+    """
+    def load():
+        return list(BannedWord.objects.filter(is_active=True).values_list('term', flat=True))
+
+    if settings.CACHE_ENABLED:
+        words = cached(make_cache_key('banned_word', 'list'), settings.CACHE_TIMEOUT, load)
+    else:
+        words = load()
+
+    return tuple(sorted({word.casefold() for word in [*settings.BANNED_WORDS, *words] if word}))
+
+
+def build_trie_pattern(trie):
+    """
+    Преобразует префиксное дерево слов в регулярное выражение,
+    в котором общие префиксы слов проверяются один раз.
+    """
+    if '' in trie and len(trie) == 1:
+        return ''
+
+    branches = [
+        re.escape(char) + build_trie_pattern(child)
+        for char, child in sorted(trie.items()) if char
+    ]
+    pattern = branches[0] if len(branches) == 1 else f'(?:{"|".join(branches)})'
+    if '' in trie:
+        # Слово заканчивается здесь, но есть и более длинные слова.
+        pattern = f'(?:{pattern})?'
+
+    return pattern
+
+
+@lru_cache(maxsize=8)
+def compile_banned_words(words):
+    """
+    Компилирует запрещенные слова в одно регулярное выражение
+    по префиксному дереву. Результат запоминается в процессе
+    для каждого набора слов.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    return re.compile(build_trie_pattern(trie)) if trie else None
+
+
+def find_banned_words(text, pattern=None):
+    """
+    Возвращает запрещенные слова, найденные в тексте, в порядке
+    появления. Слова ищутся как подстроки без учета регистра,
+    поэтому основа слова находит все его формы.
+    """
+    if pattern is None:
+        pattern = compile_banned_words(get_banned_words())
+    if not text or pattern is None:
+        return []
+
+    return list(dict.fromkeys(match.group() for match in pattern.finditer(text.casefold())))
+
+
+def validate_banned_words(text):
+    """ Вызывает ошибку валидации, если в тексте есть запрещенные слова. """
+    found = find_banned_words(text)
+    if found:
+        raise ValidationError(f'Слово "{found[0]}" не может использоваться.')
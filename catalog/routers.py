@@ -0,0 +1,62 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Приложения, которые всегда читают с основной базы данных.
+PRIMARY_APPS = {'sessions'}
+
+# Чтение текущего запроса (или потока команды) идет с основной базы.
+use_primary = ContextVar('use_primary', default=False)
+# В текущем запросе была запись в основную базу.
+has_written = ContextVar('has_written', default=False)
+
+
+@contextmanager
+def untracked_writes():
+    """
+    Записи внутри блока не закрепляют чтение за основной базой.
+    Используется для служебных записей вроде счетчиков просмотров,
+    отставание которых на реплике пользователю не важно.
+    """
+    primary_token = use_primary.set(use_primary.get())
+    written_token = has_written.set(has_written.get())
+    try:
+        yield
+    finally:
+        use_primary.reset(primary_token)
+        has_written.reset(written_token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Маршрутизатор баз данных: запись идет в основную базу (default),
+    чтение - в случайную реплику из REPLICA_DATABASES. После записи
+    чтение переключается на основную базу, чтобы пользователь
+    не видел отставания реплики от своих изменений.
+    """
+
+    def db_for_read(self, model, **hints):
+        """ Возвращает базу для чтения: реплику или основную. """
+        if (not settings.REPLICA_DATABASES or use_primary.get()
+                or model._meta.app_label in PRIMARY_APPS
+                or connections['default'].in_atomic_block):
+            return 'default'
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        """ Возвращает основную базу и закрепляет за ней чтение. """
+        if model._meta.app_label not in PRIMARY_APPS:
+            use_primary.set(True)
+            has_written.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """ Реплики содержат те же данные, связи разрешены. """
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """ Миграции применяются только к основной базе. """
+        return db == 'default'
@@ -1,32 +1,363 @@
+import time
+
 from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchHeadline
 from django.core.cache import cache
+from django.db.models import F, Prefetch
+
+from catalog.caching import acached, cached, get_lock_key, set_cached_many
+from catalog.models import Category, Blog, Product, Version
+from catalog.routers import untracked_writes
+from users.services import aget_group_names, get_group_names
+
+# Маркеры подсветки совпадений, заменяются на <mark> после экранирования.
+HIGHLIGHT_START = '[[['
+HIGHLIGHT_STOP = ']]]'
+
+
+def get_initial_generation():
+    """
+    Возвращает начальное поколение пространства имен: время в мс.
+    Если ключ поколения вытеснен из кэша, новое поколение не совпадет
+    с прежними, и старые ключи пространства не станут снова актуальными.
+    """
+    return time.time_ns() // 1_000_000
+
+
+def get_cache_generation(namespace):
+    """
+    Возвращает текущее поколение пространства имен кэша.
+    Поколение входит в ключи, поэтому его увеличение
+    делает все прежние ключи пространства недействительными.
+    """
+    key = f'{namespace}_generation'
+    initial = get_initial_generation()
+    cache.add(key, initial, timeout=None)
+    return cache.get(key, initial)
+
+
+def bump_cache_generation(namespace):
+    """ Сбрасывает кэш пространства имен, увеличивая его поколение. """
+    key = f'{namespace}_generation'
+    cache.add(key, get_initial_generation(), timeout=None)
+    cache.incr(key)
+
+
+def make_cache_key(namespace, key):
+    """ Возвращает ключ кэша с учетом поколения пространства имен. """
+    return f'{namespace}_{get_cache_generation(namespace)}_{key}'
 
-from catalog.models import Category
+
+async def aget_cache_generation(namespace):
+    """ Асинхронная версия get_cache_generation. """
+    key = f'{namespace}_generation'
+    initial = get_initial_generation()
+    await cache.aadd(key, initial, timeout=None)
+    return await cache.aget(key, initial)
+
+
+async def amake_cache_key(namespace, key):
+    """ Асинхронная версия make_cache_key. """
+    return f'{namespace}_{await aget_cache_generation(namespace)}_{key}'
 
 
 def get_category_cache(pk):
     """ Получение категории из кэша или базы данных. """
     if settings.CACHE_ENABLED:
-        key = f'category_{pk}'
-        category = cache.get(key)
-        if category is None:
-            category = Category.objects.get(pk=pk)
-            cache.set(key, category)
-    else:
-        category = Category.objects.get(pk=pk)
+        return cached(make_cache_key('category', pk), settings.CACHE_TIMEOUT,
+                      lambda: Category.objects.get(pk=pk))
 
-    return category
+    return Category.objects.get(pk=pk)
 
 
 def get_categories_cache():
     """ Получение всех категорий из кэша или базы данных. """
     if settings.CACHE_ENABLED:
-        key = 'category_list'
-        category_list = cache.get(key)
-        if category_list is None:
-            category_list = Category.objects.all()
-            cache.set(key, category_list)
+        # Сохраняем в кэш список объектов, а не ленивый queryset.
+        return cached(make_cache_key('category', 'list'), settings.CACHE_TIMEOUT,
+                      lambda: list(Category.objects.all()))
+
+    return Category.objects.all()
+
+
+def warm_category_cache():
+    """
+    Заполняет кэш всех категорий и списка категорий.
+    Возвращает количество записанных ключей.
+    """
+    start = time.perf_counter()
+    category_list = list(Category.objects.all())
+    values = {make_cache_key('category', category.pk): category for category in category_list}
+    values[make_cache_key('category', 'list')] = category_list
+    set_cached_many(values, settings.CACHE_TIMEOUT, time.perf_counter() - start)
+
+    return len(values)
+
+
+async def aget_category_cache(pk):
+    """ Асинхронная версия get_category_cache. """
+    if settings.CACHE_ENABLED:
+        return await acached(await amake_cache_key('category', pk), settings.CACHE_TIMEOUT,
+                             lambda: Category.objects.aget(pk=pk))
+
+    return await Category.objects.aget(pk=pk)
+
+
+async def aget_categories_cache():
+    """
+    Асинхронная версия get_categories_cache.
+    Всегда возвращает загруженный список категорий.
+    """
+    async def load():
+        return [category async for category in Category.objects.all()]
+
+    if settings.CACHE_ENABLED:
+        return await acached(await amake_cache_key('category', 'list'),
+                             settings.CACHE_TIMEOUT, load)
+
+    return await load()
+
+
+def get_viewer_role(user, obj=None):
+    """
+    Возвращает класс роли пользователя относительно объекта
+    (аноним, владелец, модератор, менеджер, суперпользователь),
+    от которого зависит отображение страницы.
+    """
+    if not user.is_authenticated:
+        return 'anonymous'
+
+    return make_viewer_role(user, get_group_names(user), obj)
+
+
+async def aget_viewer_role(user, obj=None):
+    """ Асинхронная версия get_viewer_role. """
+    if not user.is_authenticated:
+        return 'anonymous'
+
+    return make_viewer_role(user, await aget_group_names(user), obj)
+
+
+def make_viewer_role(user, groups, obj=None):
+    """ Составляет класс роли пользователя по его группам. """
+    roles = [
+        role for role, has_role in (
+            ('owner', obj is not None and user.pk == obj.creator_id),
+            ('moderator', 'Модератор' in groups),
+            ('manager', 'Менеджер' in groups),
+            ('superuser', user.is_superuser),
+        ) if has_role
+    ]
+
+    return '-'.join(roles) or 'user'
+
+
+def get_product_detail_cache_key(product, user):
+    """
+    Возвращает ключ кэша страницы товара: товар, время
+    его изменения и класс роли пользователя.
+    """
+    modified = product.date_modified.timestamp()
+    role = get_viewer_role(user, product)
+    return f'product_detail_{product.pk}_{modified}_{role}'
+
+
+async def aget_product_detail_cache_key(product, user):
+    """ Асинхронная версия get_product_detail_cache_key. """
+    modified = product.date_modified.timestamp()
+    role = await aget_viewer_role(user, product)
+    return f'product_detail_{product.pk}_{modified}_{role}'
+
+
+def get_main_products(queryset=None):
+    """ Возвращает 6 опубликованных товаров главной страницы вместе с продавцами. """
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    return queryset.filter(is_published=True).select_related('creator')[:6]
+
+
+def get_category_products(pk, queryset=None):
+    """
+    Возвращает опубликованные товары категории. Продавцы и активные
+    версии загружаются за фиксированное число запросов.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+
+    queryset = queryset.filter(category=pk, is_published=True)
+    return queryset.select_related('creator').prefetch_related(
+        Prefetch('version_set',
+                 queryset=Version.objects.filter(is_active=True).order_by('pk'),
+                 to_attr='active_versions')
+    )
+
+
+def get_published_blogs(queryset=None):
+    """ Возвращает опубликованные записи блога вместе с авторами. """
+    if queryset is None:
+        queryset = Blog.objects.all()
+
+    return queryset.filter(is_published=True).select_related('creator')
+
+
+VIEW_COUNT_DIRTY_KEY = 'blog_view_count_dirty'  # Номер последней отметки записи с просмотрами.
+VIEW_COUNT_FLUSHED_KEY = 'blog_view_count_flushed'  # Перенесенные отметки: (до номера, последний номер).
+VIEW_COUNT_LOCK_TIMEOUT = 10 * 60  # Время жизни блокировки переноса просмотров (сек.).
+
+
+def get_view_count_key(pk):
+    """ Возвращает ключ кэша с накопленными просмотрами записи. """
+    return f'blog_view_count_{pk}'
+
+
+def get_dirty_view_count_key(number):
+    """ Возвращает ключ отметки записи с накопленными просмотрами. """
+    return f'{VIEW_COUNT_DIRTY_KEY}_{number}'
+
+
+def mark_view_count_dirty(pk):
+    """
+    Отмечает запись с накопленными просмотрами: номер отметки
+    выдает атомарный счетчик, в ключе отметки хранится pk записи.
+    """
+    cache.add(VIEW_COUNT_DIRTY_KEY, 0, timeout=None)
+    number = cache.incr(VIEW_COUNT_DIRTY_KEY)
+    cache.set(get_dirty_view_count_key(number), pk, timeout=None)
+
+
+def increment_view_count(blog):
+    """
+    Увеличивает счетчик просмотров записи.
+    При включенном кэше просмотры копятся атомарным счетчиком
+    и позже переносятся в базу данных командой flush_view_counts,
+    иначе счетчик увеличивается одним UPDATE без сохранения всей записи.
+    """
+    if settings.CACHE_ENABLED:
+        key = get_view_count_key(blog.pk)
+        cache.add(key, 0, timeout=None)
+        # Первый просмотр после переноса отмечает запись для flush_view_counts.
+        if cache.incr(key) == 1:
+            mark_view_count_dirty(blog.pk)
     else:
-        category_list = Category.objects.all()
+        with untracked_writes():
+            Blog.objects.filter(pk=blog.pk).update(view_count=F('view_count') + 1)
+        blog.view_count += 1
+
+
+def get_pending_view_count(pk):
+    """ Возвращает просмотры записи, еще не перенесенные в базу данных. """
+    if settings.CACHE_ENABLED:
+        return cache.get(get_view_count_key(pk), 0)
+
+    return 0
+
+
+def get_live_view_count(blog):
+    """ Возвращает актуальное число просмотров записи. """
+    return blog.view_count + get_pending_view_count(blog.pk)
+
+
+def get_dirty_view_counts(chunk_size=500):
+    """
+    Возвращает pk отмеченных записей и номер, до которого
+    отметки можно удалить. Отсутствующая отметка могла еще
+    не записаться, поэтому удаление останавливается перед ней.
+    Если ее нет и при следующем переносе, она считается потерянной.
+    """
+    last = cache.get(VIEW_COUNT_DIRTY_KEY, 0)
+    flushed, previous_last = cache.get(VIEW_COUNT_FLUSHED_KEY, (0, 0))
+    numbers = range(flushed + 1, last + 1)
+    pks = set()
+    flushed = last
+    for start in range(0, len(numbers), chunk_size):
+        keys = {get_dirty_view_count_key(number): number
+                for number in numbers[start:start + chunk_size]}
+        values = cache.get_many(keys)
+        for key, number in keys.items():
+            if key in values:
+                pks.add(values[key])
+            elif number > previous_last:
+                flushed = min(flushed, number - 1)
+
+    return sorted(pks), flushed, last
+
+
+def flush_view_counts(chunk_size=500):
+    """
+    Переносит накопленные просмотры отмеченных записей из кэша
+    в базу данных одним UPDATE на запись. Возвращает число
+    обновленных записей. Перенос выполняет только процесс,
+    получивший блокировку, иначе просмотры были бы учтены дважды.
+    """
+    if not settings.CACHE_ENABLED:
+        return 0
+
+    lock_key = get_lock_key(VIEW_COUNT_FLUSHED_KEY)
+    if not cache.add(lock_key, 1, VIEW_COUNT_LOCK_TIMEOUT):
+        return 0
+
+    try:
+        return transfer_view_counts(chunk_size)
+    finally:
+        cache.delete(lock_key)
+
+
+def transfer_view_counts(chunk_size):
+    """ Переносит просмотры для flush_view_counts под блокировкой. """
+    flushed = 0
+    pks, flushed_number, last = get_dirty_view_counts(chunk_size)
+    for start in range(0, len(pks), chunk_size):
+        keys = {get_view_count_key(pk): pk for pk in pks[start:start + chunk_size]}
+        for key, count in cache.get_many(keys).items():
+            if not count:
+                continue
+            Blog.objects.filter(pk=keys[key]).update(
+                view_count=F('view_count') + count
+            )
+            flushed += 1
+            # Уменьшаем счетчик только после UPDATE и на перенесенное значение,
+            # чтобы не потерять просмотры, пришедшие во время переноса.
+            try:
+                pending = cache.decr(key, count)
+            except ValueError:
+                # Счетчик вытеснен из кэша: перенесенные просмотры уже учтены,
+                # новый просмотр создаст и отметит счетчик заново.
+                continue
+            if pending > 0:
+                mark_view_count_dirty(keys[key])
+
+    first, __ = cache.get(VIEW_COUNT_FLUSHED_KEY, (0, 0))
+    numbers = range(first + 1, flushed_number + 1)
+    for start in range(0, len(numbers), chunk_size):
+        cache.delete_many([get_dirty_view_count_key(number)
+                           for number in numbers[start:start + chunk_size]])
+    cache.set(VIEW_COUNT_FLUSHED_KEY, (flushed_number, last), timeout=None)
+
+    return flushed
+
+
+def get_search_query(text):
+    """ Возвращает поисковый запрос по товарам (русская морфология). """
+    return SearchQuery(text, config='russian', search_type='websearch')
+
+
+def search_products(text, queryset=None):
+    """
+    Возвращает товары, найденные полнотекстовым поиском по индексу
+    search_vector, отсортированные по релевантности, с подсветкой совпадений.
+    """
+    if queryset is None:
+        queryset = Product.objects.all()
+    query = get_search_query(text)
+    highlight = {
+        'config': 'russian',
+        'start_sel': HIGHLIGHT_START,
+        'stop_sel': HIGHLIGHT_STOP,
+    }
 
-    return category_list
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        title_headline=SearchHeadline('title', query, highlight_all=True, **highlight),
+        description_headline=SearchHeadline('description', query, max_words=35, **highlight),
+    ).order_by('-rank', '-id')
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from catalog.models import BannedWord, Category, Product, Version
+from catalog.services import bump_cache_generation
+from users.models import User
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    """ Сбрасывает кэш категорий после их изменения или удаления. """
+    if settings.CACHE_ENABLED:
+        bump_cache_generation('category')
+
+
+@receiver([post_save, post_delete], sender=BannedWord)
+def invalidate_banned_word_cache(sender, **kwargs):
+    """ Сбрасывает кэш запрещенных слов после их изменения или удаления. """
+    if settings.CACHE_ENABLED:
+        bump_cache_generation('banned_word')
+
+
+@receiver([post_save, post_delete], sender=Version)
+def touch_product(sender, instance, **kwargs):
+    """
+    Обновляет время изменения товара после изменения его версий,
+    чтобы сбросить кэш страницы товара.
+    """
+    Product.objects.filter(pk=instance.product_id).update(date_modified=timezone.now())
+
+
+@receiver(post_init, sender=User)
+def remember_creator_name(sender, instance, **kwargs):
+    """ Запоминает загруженное имя продавца, чтобы сравнивать его без запроса. """
+    instance._loaded_first_name = instance.__dict__.get('first_name')
+
+
+@receiver(pre_save, sender=User)
+def check_creator_name(sender, instance, update_fields=None, **kwargs):
+    """ Запоминает, изменилось ли имя продавца, показываемое на карточках товаров. """
+    instance._name_changed = False
+    if instance._state.adding or (update_fields is not None and 'first_name' not in update_fields):
+        return
+    old_name = getattr(instance, '_loaded_first_name', None)
+    if old_name is None:
+        # Имя не загружалось (отложенное поле): читаем его из базы данных.
+        old_name = User.objects.filter(pk=instance.pk).values_list('first_name', flat=True).first()
+    instance._name_changed = old_name is not None and old_name != instance.first_name
+
+
+@receiver(post_save, sender=User)
+def touch_creator_products(sender, instance, **kwargs):
+    """
+    Обновляет время изменения товаров продавца после смены его имени,
+    чтобы сбросить валидаторы и кэш страниц с этими товарами.
+    """
+    if getattr(instance, '_name_changed', False):
+        Product.objects.filter(creator=instance).update(date_modified=timezone.now())
+    instance._loaded_first_name = instance.__dict__.get('first_name')
@@ -0,0 +1,188 @@
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from catalog.models import Product, Version
+
+CHUNK_SIZE = 64 * 1024  # Размер читаемого блока файла (символы).
+EXPORT_CHUNK_SIZE = 2000  # Количество товаров, читаемых курсором за раз.
+# Поля выгрузки каталога.
+EXPORT_FIELDS = (
+    'id', 'title', 'description', 'price', 'category', 'is_published',
+    'creator_id', 'active_version', 'date_add', 'date_modified',
+)
+
+
+def iter_json_records(file, chunk_size=CHUNK_SIZE):
+    """
+    Построчно (по одному объекту) читает записи из JSON-массива
+    или JSONL без загрузки всего файла в память.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+
+    while True:
+        # Пропускаем пробелы, разделители и скобки массива.
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            position += 1
+
+        if position == len(buffer):
+            if eof:
+                return
+            buffer, position = file.read(chunk_size), 0
+            eof = not buffer
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Запись не поместилась в буфер, дочитываем файл.
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+
+        position = end
+        yield record
+
+
+def iter_batches(iterable, batch_size):
+    """ Разбивает поток записей на списки по batch_size элементов. """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def dedupe_last(items, key):
+    """
+    Оставляет по одному элементу на значение key(item) - последний
+    в списке, сохраняя порядок последних вхождений.
+    """
+    unique = {}
+    for item in items:
+        unique.pop(key(item), None)
+        unique[key(item)] = item
+    return list(unique.values())
+
+
+class Echo:
+    """ Буфер для csv.writer, возвращающий записанную строку. """
+
+    def write(self, value):
+        return value
+
+
+def parse_since(value):
+    """
+    Преобразует дату или дату и время в формате ISO
+    в datetime с часовым поясом. Возвращает None для пустого значения.
+    """
+    if not value:
+        return None
+
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f'Неверная дата: {value}')
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+
+    return since
+
+
+def get_export_queryset(since=None):
+    """
+    Возвращает товары для выгрузки с категориями и активными
+    версиями, измененные не раньше since.
+    """
+    queryset = Product.objects.select_related('category').prefetch_related(
+        Prefetch('version_set',
+                 queryset=Version.objects.filter(is_active=True).order_by('pk'),
+                 to_attr='active_versions')
+    ).defer('search_vector').order_by('pk')
+    if since is not None:
+        queryset = queryset.filter(date_modified__gte=since)
+
+    return queryset
+
+
+def get_export_row(product):
+    """ Возвращает запись выгрузки товара. Продавец выгружается по id. """
+    active_version = product.active_version
+    return {
+        'id': product.pk,
+        'title': product.title,
+        'description': product.description,
+        'price': str(product.price),
+        'category': product.category.title,
+        'is_published': product.is_published,
+        'creator_id': product.creator_id,
+        'active_version': str(active_version) if active_version else None,
+        'date_add': product.date_add.isoformat(),
+        'date_modified': product.date_modified.isoformat(),
+    }
+
+
+def iter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Построчно возвращает товары для выгрузки. Товары читаются курсором
+    на сервере, связанные данные загружаются пакетом на каждый блок.
+    """
+    for product in queryset.iterator(chunk_size=chunk_size):
+        yield get_export_row(product)
+
+
+async def aiter_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Асинхронная версия iter_export_rows: под ASGI Django буферизует
+    синхронный итератор потокового ответа целиком в памяти.
+    """
+    async for product in queryset.aiterator(chunk_size=chunk_size):
+        yield get_export_row(product)
+
+
+def iter_csv(rows):
+    """ Возвращает строки CSV с заголовком по одной. """
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writerow(dict(zip(EXPORT_FIELDS, EXPORT_FIELDS)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    """ Возвращает строки JSONL по одной. """
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+async def aiter_csv(rows):
+    """ Асинхронная версия iter_csv. """
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+    yield writer.writerow(dict(zip(EXPORT_FIELDS, EXPORT_FIELDS)))
+    async for row in rows:
+        yield writer.writerow(row)
+
+
+async def aiter_jsonl(rows):
+    """ Асинхронная версия iter_jsonl. """
+    async for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+# Форматы выгрузки: функции сериализации (синхронная и асинхронная)
+# и тип содержимого.
+EXPORT_FORMATS = {
+    'csv': (iter_csv, aiter_csv, 'text/csv'),
+    'jsonl': (iter_jsonl, aiter_jsonl, 'application/jsonl'),
+}
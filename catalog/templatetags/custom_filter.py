@@ -1,4 +1,9 @@
 from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from catalog.services import HIGHLIGHT_START, HIGHLIGHT_STOP
+from users.services import get_group_names
 
 register = template.Library()
 
@@ -15,4 +20,15 @@ def mediapath(image):
 @register.filter(name='has_group')
 def has_group(user, group_name):
     """ Проверяет вхождение пользователя в группу. """
-    return user.groups.filter(name=group_name).exists()
+    return group_name in get_group_names(user)
+
+
+@register.filter
+def highlight(text):
+    """ Экранирует текст и выделяет найденные поиском совпадения. """
+    if not text:
+        return ''
+
+    text = escape(text)
+    text = text.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+    return mark_safe(text)
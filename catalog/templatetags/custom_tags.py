@@ -1,4 +1,8 @@
 from django import template
+from django.conf import settings
+from django.utils.html import format_html
+
+from catalog.thumbnails import get_thumbnail_url
 
 register = template.Library()
 
@@ -10,3 +14,21 @@ def mediapath(image):
         return f"/media/{image}"
 
     return "#"
+
+
+@register.simple_tag
+def srcset(image, size_name, width=None):
+    """
+    Возвращает атрибуты src, srcset и sizes с уменьшенными
+    копиями изображения для набора размеров size_name.
+    width - ширина отображения, по умолчанию первая ширина набора.
+    """
+    if not image:
+        return format_html('src="#"')
+
+    widths = settings.THUMBNAIL_SIZES[size_name]
+    urls = [get_thumbnail_url(str(image), width) for width in widths]
+    candidates = ', '.join(f'{url} {width}w' for url, width in zip(urls, widths))
+
+    return format_html('src="{}" srcset="{}" sizes="{}px"',
+                       urls[0], candidates, width or widths[0])
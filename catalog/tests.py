@@ -1,3 +1,181 @@
-from django.test import TestCase
+import json
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Blog, Category, Product, Version
+from catalog.views import ProductListView
+from users.models import EmailVerification, User
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True, QUERY_BUDGET_RAISE=True)
+class ProductListQueriesTestCase(TestCase):
+    """ Количество SQL-запросов страницы товаров категории. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='viewer@example.com', is_active=True)
+        cls.category = Category.objects.create(title='Стратегии')
+        for i in range(30):
+            creator = User.objects.create(email=f'seller{i}@example.com',
+                                          first_name=f'Продавец {i}', is_active=True)
+            product = Product.objects.create(title=f'Игра {i}', category=cls.category,
+                                             price=100, is_published=True, creator=creator)
+            Version.objects.create(product=product, version_number='1.0',
+                                   title='Старая', is_active=False)
+            Version.objects.create(product=product, version_number='2.0',
+                                   title='Текущая', is_active=True)
+
+    def get_page(self, page_size):
+        """ Возвращает страницу категории с page_size товарами. """
+        self.client.force_login(self.user)
+        with mock.patch.object(ProductListView, 'paginate_by', page_size):
+            # Сессия, пользователь, валидаторы, группы, товары с продавцами,
+            # активные версии и категория.
+            with self.assertNumQueries(7), self.assertLogs('catalog.metrics', 'INFO') as logs:
+                response = self.client.get(reverse('catalog:goods', args=[self.category.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(logs.records[0].getMessage())['queries'], 7)
+        return response
+
+    def test_queries_do_not_depend_on_page_size(self):
+        """ Число запросов не зависит от количества товаров на странице. """
+        for page_size in (5, 25):
+            response = self.get_page(page_size)
+            products = response.context['object_list']
+            self.assertEqual(len(products), page_size)
+            self.assertContains(response, 'Текущая', count=page_size)
+            self.assertContains(response, products[0].creator.first_name)
+
+
+@override_settings(
+    REQUEST_METRICS_ENABLED=True, CACHE_ENABLED=True,
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+)
+class ProductDetailMetricsTestCase(TestCase):
+    """ Метрики страницы товара из кэша страниц. """
+
+    def test_cache_hit_has_no_template_time(self):
+        """ Промах кэша рендерит шаблон, попадание отмечается без времени шаблона. """
+        user = User.objects.create(email='admin@example.com', is_active=True, is_superuser=True)
+        category = Category.objects.create(title='Шутеры')
+        product = Product.objects.create(title='Игра', category=category, price=100,
+                                         is_published=True, creator=user)
+        self.client.force_login(user)
+        url = reverse('catalog:product', args=[product.pk])
+
+        with self.assertLogs('catalog.metrics', 'INFO'):
+            miss = self.client.get(url)
+        self.assertIn('tpl;dur=', miss['Server-Timing'])
+        self.assertIn('cache;desc=miss', miss['Server-Timing'])
+
+        with self.assertLogs('catalog.metrics', 'INFO') as logs:
+            hit = self.client.get(url)
+        self.assertNotIn('tpl;dur=', hit['Server-Timing'])
+        self.assertIn('cache;desc=hit', hit['Server-Timing'])
+        self.assertIsNone(json.loads(logs.records[0].getMessage())['template_ms'])
+        self.assertEqual(hit.content, miss.content)
+
+
+class CatalogExportTestCase(TestCase):
+    """ Потоковая выгрузка каталога. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create(email='seller@example.com', is_active=True)
+        category = Category.objects.create(title='Пазлы')
+        Product.objects.create(title='Игра', category=category, price=100,
+                               is_published=False, creator=cls.seller)
+
+    def test_requires_export_permission(self):
+        """ Права на просмотр товаров недостаточно для выгрузки. """
+        self.seller.user_permissions.add(Permission.objects.get(codename='view_product'))
+        self.client.force_login(self.seller)
+        response = self.client.get(reverse('catalog:export'))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_export_without_emails(self):
+        """ Выгрузка под ASGI идет асинхронным потоком и не содержит почты продавцов. """
+        await self.seller.user_permissions.aadd(
+            await Permission.objects.aget(codename='export_product')
+        )
+        await self.async_client.aforce_login(self.seller)
+        response = await self.async_client.get(reverse('catalog:export'), {'format': 'jsonl'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertIn(f'"creator_id": {self.seller.pk}', content)
+        self.assertNotIn(self.seller.email, content)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Индексы и планы запросов для PostgreSQL.')
+class CatalogIndexesTestCase(TestCase):
+    """ Планы горячих запросов каталога используют индексы. """
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(email='author@example.com', is_active=True)
+        cls.category = Category.objects.create(title='Гонки')
+        cls.products = [
+            Product.objects.create(title=f'Игра {i}', category=cls.category, price=100,
+                                   is_published=bool(i % 2), creator=user)
+            for i in range(20)
+        ]
+        for product in cls.products:
+            Version.objects.create(product=product, version_number='1.0',
+                                   title='Версия', is_active=True)
+        for i in range(20):
+            Blog.objects.create(title=f'Запись {i}', creator=user, is_published=bool(i % 2))
+        EmailVerification.objects.create(user=user, token='token')
+
+    def setUp(self):
+        # На маленьких таблицах планировщик выбирает полный просмотр.
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index_name):
+        """ Проверяет, что план запроса использует индекс index_name. """
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def get_slug_index_names(self):
+        """
+        Возвращает имена индексов slug записей блога: уникального
+        и созданного Django для поиска по шаблону (_like).
+        """
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Blog._meta.db_table)
+        return [name for name, constraint in constraints.items()
+                if constraint['columns'] == ['slug'] and constraint['index']]
+
+    def test_category_page(self):
+        """ Страница категории: опубликованные товары по дате добавления. """
+        queryset = Product.objects.filter(
+            category=self.category, is_published=True
+        ).order_by('date_add', 'id')[:21]
+        self.assertUsesIndex(queryset, 'product_published_category_idx')
+
+    def test_active_versions_prefetch(self):
+        """ Предзагрузка активных версий товаров страницы. """
+        queryset = Version.objects.filter(is_active=True, product__in=self.products[:5])
+        self.assertUsesIndex(queryset, 'version_active_product_idx')
+
+    def test_blog_list(self):
+        """ Список опубликованных записей блога от новых к старым. """
+        queryset = Blog.objects.filter(is_published=True).order_by('-creation_date', '-id')[:21]
+        self.assertUsesIndex(queryset, 'blog_published_date_idx')
+
+    def test_blog_slug_lookup(self):
+        """ Поиск записи блога по slug. """
+        plan = Blog.objects.filter(slug='zapis-1').explain()
+        self.assertTrue(any(name in plan for name in self.get_slug_index_names()), plan)
+
+    def test_email_verification_token_lookup(self):
+        """ Поиск токена верификации почты. """
+        queryset = EmailVerification.objects.filter(token='token')
+        self.assertUsesIndex(queryset, 'email_verification_token_idx')
@@ -0,0 +1,102 @@
+import os
+from io import BytesIO
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+
+# Поля изображений и наборы размеров их уменьшенных копий.
+THUMBNAIL_FIELDS = (
+    ('catalog.Product', 'image', 'product'),
+    ('catalog.Category', 'image', 'category'),
+    ('catalog.Blog', 'preview', 'blog'),
+    ('users.User', 'avatar', 'avatar'),
+)
+
+KNOWN_LIMIT = 10000  # Сколько путей существующих копий процесс помнит без проверки.
+known_thumbnails = set()  # Пути копий, существование которых уже проверено.
+
+
+def get_thumbnail_name(image_name, width):
+    """ Возвращает путь уменьшенной копии изображения в media. """
+    name, __ = os.path.splitext(image_name)
+    extension = settings.THUMBNAIL_FORMAT.lower()
+    return f'{settings.THUMBNAIL_DIR}/{name}_{width}.{extension}'
+
+
+def remember_thumbnail(thumbnail_name):
+    """ Запоминает путь существующей копии, чтобы не проверять его при рендере. """
+    if len(known_thumbnails) >= KNOWN_LIMIT:
+        known_thumbnails.clear()
+    known_thumbnails.add(thumbnail_name)
+
+
+def replace_file(name, content):
+    """
+    Записывает файл в media, заменяя прежний. В локальном хранилище
+    (FileSystemStorage) замена атомарна: файл пишется под временным
+    именем и переименовывается, читатели видят старый или новый файл
+    целиком. В остальных хранилищах прежний файл удаляется перед
+    записью, и замена не атомарна.
+    """
+    if not isinstance(default_storage, FileSystemStorage):
+        default_storage.delete(name)
+        default_storage.save(name, content)
+        return
+
+    # save выбирает свободное имя, поэтому процессы не пишут в один файл.
+    temp_name = default_storage.save(f'{name}.tmp', content)
+    os.replace(default_storage.path(temp_name), default_storage.path(name))
+
+
+def create_thumbnail(image_name, width):
+    """
+    Создает уменьшенную копию изображения заданной ширины
+    с сохранением пропорций и возвращает ее путь в media.
+    """
+    thumbnail_name = get_thumbnail_name(image_name, width)
+
+    with default_storage.open(image_name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.thumbnail((width, width * 10))
+        if settings.THUMBNAIL_FORMAT == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        buffer = BytesIO()
+        image.save(buffer, settings.THUMBNAIL_FORMAT,
+                   quality=settings.THUMBNAIL_QUALITY)
+
+    replace_file(thumbnail_name, ContentFile(buffer.getvalue()))
+    remember_thumbnail(thumbnail_name)
+
+    return thumbnail_name
+
+
+def get_thumbnail_url(image_name, width):
+    """
+    Возвращает адрес уменьшенной копии изображения,
+    создавая ее при первом обращении. Если копию создать
+    не удалось, возвращает адрес оригинала.
+    """
+    thumbnail_name = get_thumbnail_name(image_name, width)
+    if thumbnail_name in known_thumbnails:
+        return default_storage.url(thumbnail_name)
+
+    if default_storage.exists(thumbnail_name):
+        remember_thumbnail(thumbnail_name)
+    else:
+        try:
+            create_thumbnail(image_name, width)
+        except (OSError, ValueError):
+            return default_storage.url(image_name)
+
+    return default_storage.url(thumbnail_name)
+
+
+def create_thumbnails(image_name, size_name):
+    """ Создает все уменьшенные копии изображения для набора размеров. """
+    return [
+        create_thumbnail(image_name, width)
+        for width in settings.THUMBNAIL_SIZES[size_name]
+    ]
@@ -14,14 +14,23 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.urls import path
+from catalog import async_views, views
 from catalog.apps import CatalogConfig
-from django.views.decorators.cache import cache_page, never_cache
-from catalog.views import (MainListView, ContactCreateView, CategoryListView,
-                           ProductListView, ProductDetailView, BlogListView,
+from django.views.decorators.cache import never_cache
+from catalog.views import (CatalogExportView, ContactCreateView, ProductSearchView,
                            BlogCreateView, BlogDetailView, BlogUpdateView, BlogDeleteView,
                            ProductCreateView, ProductUpdateView, ProductDeleteView, ContactThankView)
 
+# Представления чтения каталога: асинхронные под ASGI или синхронные.
+read_views = async_views if settings.ASYNC_VIEWS else views
+MainListView = read_views.MainListView
+CategoryListView = read_views.CategoryListView
+ProductListView = read_views.ProductListView
+ProductDetailView = read_views.ProductDetailView
+BlogListView = read_views.BlogListView
+
 app_name = CatalogConfig.name
 
 urlpatterns = [
@@ -30,12 +39,15 @@ urlpatterns = [
     path('contacts/', ContactCreateView.as_view(), name='contact'),
     path('contacts/thank-you/', ContactThankView.as_view(), name='contact_thank_you'),
 
-    path('categories/', cache_page(60)(CategoryListView.as_view()), name='categories'),
+    path('categories/', CategoryListView.as_view(), name='categories'),
+
+    path('search/', ProductSearchView.as_view(), name='search'),
+    path('export/', never_cache(CatalogExportView.as_view()), name='export'),
 
     path('categories/<int:pk>/', ProductListView.as_view(), name='goods'),
     path('categories/<int:pk>/create/', never_cache(ProductCreateView.as_view()), name='create_product'),
     path('products/<int:pk>/edit/', never_cache(ProductUpdateView.as_view()), name='update_product'),
-    path('products/<int:pk>/', cache_page(60)(ProductDetailView.as_view()), name='product'),
+    path('products/<int:pk>/', ProductDetailView.as_view(), name='product'),
     path('products/<int:pk>/delete/', ProductDeleteView.as_view(), name='delete_product'),
 
     path('blog/', BlogListView.as_view(), name='blog_list'),
@@ -1,29 +1,53 @@
 from typing import Any
-from pytils.translit import slugify
+from django.db.models import Count, Max, Q
 from django.forms import inlineformset_factory
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import redirect
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth.mixins import (LoginRequiredMixin,
                                         PermissionRequiredMixin)
+from django.views import View
 from django.views.generic import (ListView, DetailView, TemplateView, DeleteView,
                                   CreateView, UpdateView)
 
+from catalog.caching import cached
+from catalog.mixins import (ConditionalGetMixin, KeysetPaginationMixin,
+                            ObjectPermissionRequiredMixin)
+from catalog.middleware import render_page
 from catalog.forms import BlogForm, ProductForm, VersionForm, ModeratorForm, ContactForm
-from catalog.models import Product, Category, Contact, Blog, Version
-from catalog.services import get_category_cache
-
-
-class MainListView(ListView):
+from catalog.models import Product, Category, Contact, Blog, BlogRedirect, Version
+from catalog.services import (get_category_cache, get_categories_cache,
+                              increment_view_count, get_live_view_count,
+                              search_products, get_product_detail_cache_key,
+                              get_viewer_role, get_main_products,
+                              get_category_products, get_published_blogs)
+from catalog.streaming import (EXPORT_FORMATS, aiter_export_rows, get_export_queryset,
+                               iter_export_rows, parse_since)
+from users.services import get_group_names
+
+
+class MainListView(ConditionalGetMixin, ListView):
     """ Класс для отображения главной страницы. """
     model = Product  # Модель товара.
     template_name = 'catalog/main.html'  # Шаблон главной страницы.
     extra_context = {'title': 'Skystore'}  # Название главной страницы.
 
-    def get_queryset(self):
-        """ Возвращает 6 опубликованных товаров. """
-        queryset = super().get_queryset()
-        queryset = queryset.filter(is_published=True)[:6]
+    def get_validators(self):
+        """ Валидаторы страницы: изменения опубликованных товаров, роль и пользователь. """
+        published = Product.objects.filter(is_published=True).aggregate(
+            last_modified=Max('date_modified'), count=Count('id')
+        )
+        user = self.request.user
+        # Карточки владельца содержат кнопки управления: учитываем пользователя.
+        parts = (published['last_modified'], published['count'], get_viewer_role(user), user.pk)
 
-        return queryset
+        return parts, published['last_modified']
+
+    def get_queryset(self):
+        """ Возвращает 6 опубликованных товаров вместе с продавцами. """
+        return get_main_products(super().get_queryset())
 
 
 class ContactCreateView(CreateView):
@@ -44,26 +68,58 @@ class ContactThankView(TemplateView):
     extra_context = {'title': 'Обратная связь'}  # Название страницы.
 
 
-class CategoryListView(ListView):
+class CategoryListView(ConditionalGetMixin, ListView):
     """ Класс для отображения страницы с жанрами игр. """
     model = Category  # Модель жанра(категории).
+    template_name = 'catalog/category_list.html'  # Шаблон списка жанров.
     extra_context = {'title': 'Жанры'}  # Название страницы.
 
+    def get_queryset(self):
+        """ Возвращает список категорий из кэша или базы данных. """
+        # Список используется и валидаторами, и шаблоном - загружаем один раз.
+        if not hasattr(self, 'category_list'):
+            self.category_list = get_categories_cache()
+        return self.category_list
+
+    def get_validators(self):
+        """ Валидаторы страницы: содержимое категорий и роль. """
+        parts = [
+            (category.pk, category.title, category.description, category.image)
+            for category in self.get_queryset()
+        ]
+        parts.append(get_viewer_role(self.request.user))
+
+        return parts, None
 
-class ProductListView(ListView):
+
+class ProductListView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     """ Класс для отображения страницы с играми определенного жанра. """
     model = Product  # Модель товара.
+    cursor_fields = ('date_add', 'id')  # Поля курсора пагинации.
 
     def get_queryset(self):
         """
         Возвращает список товаров по номеру категории и
         статусу публикации для отображения на странице.
         """
-        queryset = super().get_queryset()  # Переопределяем метод.
-        queryset = queryset.filter(category=self.kwargs.get('pk'),
-                                   is_published=True)
+        return get_category_products(self.kwargs.get('pk'), super().get_queryset())
+
+    def get_validators(self):
+        """
+        Валидаторы страницы: категория, изменения ее опубликованных
+        товаров (включая версии и имена продавцов), роль и пользователь.
+        """
+        published = Q(product__is_published=True)
+        category = Category.objects.filter(pk=self.kwargs.get('pk')).annotate(
+            last_modified=Max('product__date_modified', filter=published),
+            count=Count('product', filter=published),
+        ).values_list('title', 'description', 'last_modified', 'count').first()
+        if category is None:
+            return None, None
 
-        return queryset
+        user = self.request.user
+        # Карточки владельца содержат кнопки управления: учитываем пользователя.
+        return (*category, get_viewer_role(user), user.pk), category[2]
 
     def get_context_data(self, *args, **kwargs):
         """
@@ -80,6 +136,61 @@ class ProductListView(ListView):
         return context_data
 
 
+class ProductSearchView(ListView):
+    """ Класс для отображения результатов поиска игр. """
+    model = Product  # Модель товара.
+    template_name = 'catalog/product_search.html'  # Шаблон результатов поиска.
+    search_limit = 50  # Максимальное количество результатов.
+
+    def get_queryset(self):
+        """ Возвращает опубликованные товары, найденные по запросу. """
+        text = self.request.GET.get('q', '').strip()
+        if not text:
+            return Product.objects.none()
+
+        queryset = Product.objects.filter(is_published=True).select_related('category')
+        return search_products(text, queryset)[:self.search_limit]
+
+    def get_context_data(self, *args, **kwargs):
+        """ Возвращает контекст: поисковый запрос и название страницы. """
+        context_data = super().get_context_data(*args, **kwargs)
+        context_data['query'] = self.request.GET.get('q', '')
+        context_data['title'] = 'Поиск'
+
+        return context_data
+
+
+class CatalogExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    Класс для потоковой выгрузки каталога в CSV или JSONL.
+    Параметры запроса: format - формат, since - дата изменения (ISO).
+    Выгрузка включает неопубликованные товары, поэтому требует
+    отдельного права export_product.
+    """
+    permission_required = ('catalog.export_product',)
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+        try:
+            since = parse_since(request.GET.get('since'))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        serialize, aserialize, content_type = EXPORT_FORMATS[export_format]
+        queryset = get_export_queryset(since)
+        # Под ASGI синхронный итератор был бы прочитан в память целиком.
+        if isinstance(request, ASGIRequest):
+            content = aserialize(aiter_export_rows(queryset))
+        else:
+            content = serialize(iter_export_rows(queryset))
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="catalog.{export_format}"'
+
+        return response
+
+
 class ProductCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     """ Класс для создания товара. """
     model = Product  # Модель.
@@ -137,33 +248,24 @@ class ProductCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView)
         return super().form_valid(form)
 
 
-class ProductUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+class ProductUpdateView(LoginRequiredMixin, ObjectPermissionRequiredMixin, UpdateView):
     """ Класс для создания товара. """
     model = Product  # Модель.
     permission_required = ('catalog.cancel_published_status',
                            'catalog.change_category',
                            'catalog.change_description',)
+    object_select_related = ('creator', 'category')
     # Перенаправление страницы.
     success_url = reverse_lazy('catalog:categories')
 
-    def has_permission(self):
-        """ Настраивает способ проверки разрешений. """
-        perms = self.get_permission_required()  # Получаем список разрешений.
-        # Получаем объект товара и текущего пользователя.
-        product = self.get_object()
-        user = self.request.user
-        # Проверяем, является ли пользователь владельцем товара,
-        # либо имеет необходимые права.
-        return user == product.creator or user.has_perms(perms)
-
     def get_form_class(self):
         """ Возвращает форму в зависимости от роли пользователя. """
         user = self.request.user
-        product = self.get_object()
+        product = self.get_object()  # Объект уже загружен проверкой прав.
 
         if is_moderator(user):
             return ModeratorForm
-        elif user.is_superuser or user == product.creator:
+        elif user.is_superuser or self.is_owner(product):
             return ProductForm
 
     def get_context_data(self, **kwargs):
@@ -204,38 +306,46 @@ class ProductUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView)
         return super().form_valid(form)
 
 
-class ProductDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
+class ProductDetailView(LoginRequiredMixin, ObjectPermissionRequiredMixin,
+                        ConditionalGetMixin, DetailView):
     """ Класс для отображения определенной игры. """
     model = Product
     permission_required = ('catalog.view_product',)
+    object_select_related = ('creator', 'category')
 
-    def has_permission(self):
-        """ Настраивает способ проверки разрешений. """
-        perms = self.get_permission_required()  # Получаем список разрешений.
-        # Получаем объект товара и текущего пользователя.
-        product = self.get_object()
-        user = self.request.user
-        # Проверяем, является ли пользователь владельцем товара,
-        # либо имеет необходимые права.
-        return user == product.creator or user.has_perm(perms)
+    def get_validators(self):
+        """ Валидаторы страницы: время изменения товара и роль пользователя. """
+        product = self.get_object()  # Объект уже загружен проверкой прав.
+        role = get_viewer_role(self.request.user, product)
+
+        return (product.pk, product.date_modified, role), product.date_modified
 
+    def get(self, request, *args, **kwargs):
+        """
+        Возвращает страницу товара из кэша. Ключ учитывает время
+        изменения товара и роль пользователя, права уже проверены.
+        """
+        if not settings.CACHE_ENABLED:
+            return super().get(request, *args, **kwargs)
 
-class ProductDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
+        self.object = self.get_object()
+        request.page_cache = 'hit'  # Сбрасывается render_page при промахе.
+
+        def render():
+            context = self.get_context_data(object=self.object)
+            return render_page(request, self.render_to_response(context))
+
+        key = get_product_detail_cache_key(self.object, request.user)
+        return HttpResponse(cached(key, settings.CACHE_TIMEOUT, render))
+
+
+class ProductDeleteView(LoginRequiredMixin, ObjectPermissionRequiredMixin, DeleteView):
     """ Класс для удаления определенной блоговой записи. """
     model = Product  # Модель.
     permission_required = ('catalog.delete_product',)
+    object_select_related = ('creator', 'category')
     success_url = reverse_lazy('catalog:categories')
 
-    def has_permission(self):
-        """ Настраивает способ проверки разрешений. """
-        perms = self.get_permission_required()  # Получаем список разрешений.
-        # Получаем объект товара и текущего пользователя.
-        product = self.get_object()
-        user = self.request.user
-        # Проверяем, является ли пользователь владельцем товара,
-        # либо имеет необходимые права.
-        return user == product.creator or user.has_perms(perms)
-
 
 class BlogCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     """ Класс для создания блоговой записи. """
@@ -252,27 +362,21 @@ class BlogCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
         return user.has_perms(perms)
 
     def form_valid(self, form):
-        """ Проверяет валидность формы, если успешно - сохраняет ее. """
-        if form.is_valid():
-            new_blog = form.save()
-            new_blog.creator = self.request.user
-            new_blog.slug = slugify(new_blog.title)
-            new_blog.save()
+        """ Сохраняет запись от имени автора, slug назначает модель. """
+        form.instance.creator = self.request.user
 
         return super().form_valid(form)
 
 
-class BlogListView(LoginRequiredMixin, ListView):
+class BlogListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """ Класс для отображения блога. """
     model = Blog  # Модель.
     extra_context = {'title': 'Наш блог'}  # Название страницы.
+    cursor_fields = ('-creation_date', '-id')  # Поля курсора пагинации.
 
     def get_queryset(self, *args, **kwargs):
-        """ Возвращает опубликованные записи. """
-        queryset = super().get_queryset(*args, **kwargs)
-        queryset = queryset.filter(is_published=True).order_by('creation_date').reverse()
-
-        return queryset
+        """ Возвращает опубликованные записи вместе с авторами. """
+        return get_published_blogs(super().get_queryset(*args, **kwargs))
 
 
 class BlogDetailView(LoginRequiredMixin, DetailView):
@@ -282,56 +386,39 @@ class BlogDetailView(LoginRequiredMixin, DetailView):
     def get_object(self, queryset=None):
         """ Счетчик просмотров записи. """
         self.object = super().get_object(queryset)
-        self.object.view_count += 1
-        self.object.save()
+        increment_view_count(self.object)
+        # Показываем просмотры с учетом еще не сохраненных в базу данных.
+        self.object.view_count = get_live_view_count(self.object)
 
         return self.object
 
+    def get(self, request, *args, **kwargs):
+        """ Перенаправляет с прежнего адреса записи на текущий. """
+        try:
+            return super().get(request, *args, **kwargs)
+        except Http404:
+            slug = BlogRedirect.objects.filter(old_slug=kwargs.get('slug')).values_list(
+                'blog__slug', flat=True).first()
+            if slug is None:
+                raise
+            return redirect('catalog:blog_detail', slug=slug, permanent=True)
+
 
-class BlogUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+class BlogUpdateView(LoginRequiredMixin, ObjectPermissionRequiredMixin, UpdateView):
     """ Класс для изменения определенной блоговой записи. """
     model = Blog
     form_class = BlogForm
     permission_required = ('catalog.update_blog',)
     success_url = reverse_lazy('catalog:blog_list')
 
-    def has_permission(self):
-        """ Настраивает способ проверки разрешений. """
-        perms = self.get_permission_required()  # Получаем список разрешений.
-        # Получаем объект блоговой записи и текущего пользователя.
-        blog_note = self.get_object()
-        user = self.request.user
-        # Проверяем, является ли пользователь автором записи,
-        # либо имеет необходимые права.
-        return user == blog_note.creator or user.has_perms(perms)
-
-    def form_valid(self, form):
-        """ Проверяет валидность формы, если успешно - сохраняет ее. """
-        if form.is_valid():
-            new_blog = form.save()
-            new_blog.slug = slugify(new_blog.title)
-            new_blog.save()
 
-        return super().form_valid(form)
-
-
-class BlogDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
+class BlogDeleteView(LoginRequiredMixin, ObjectPermissionRequiredMixin, DeleteView):
     """ Класс для удаления определенной блоговой записи. """
     model = Blog
     permission_required = ('catalog.delete_blog',)
     success_url = reverse_lazy('catalog:blog_list')
 
-    def has_permission(self):
-        """ Настраивает способ проверки разрешений. """
-        perms = self.get_permission_required()  # Получаем список разрешений.
-        # Получаем объект блоговой записи и текущего пользователя.
-        blog_note = self.get_object()
-        user = self.request.user
-        # Проверяем, является ли пользователь автором записи,
-        # либо имеет необходимые права.
-        return user == blog_note.creator or user.has_perms(perms)
-
 
 def is_moderator(user):
     """ Возвращает булево значение на вхождение пользователя в группу. """
-    return user.groups.filter(name='Модератор').exists()
+    return 'Модератор' in get_group_names(user)
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.http import HttpRequest
+
+from catalog.models import Category
+from catalog.moderation import get_banned_words
+from catalog.services import warm_category_cache
+from catalog.views import MainListView, ProductListView
+from users.services import warm_user_auth
+
+logger = logging.getLogger('catalog.warmup')
+
+PAGES = 100  # Количество крупнейших категорий, первые страницы которых прогреваются.
+WORKERS = 4  # Количество потоков прогрева.
+LOCK_KEY = 'cache_warmup_lock'  # Ключ блокировки прогрева при запуске.
+LOCK_TIMEOUT = 5 * 60  # Время жизни блокировки прогрева (сек.).
+
+
+def load_view(view_class, **kwargs):
+    """
+    Выполняет запросы представления списка для анонимного пользователя:
+    валидаторы и первую страницу. Возвращает количество записей.
+    """
+    request = HttpRequest()
+    request.user = AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    view.get_validators()
+
+    queryset = view.get_queryset()
+    page_size = view.get_paginate_by(queryset)
+    if page_size:
+        object_list = view.paginate_queryset(queryset, page_size)[2]
+    else:
+        object_list = list(queryset)
+
+    return len(object_list)
+
+
+def warm_categories():
+    """ Кэш категорий и списка категорий. """
+    return {'keys': warm_category_cache()}
+
+
+def warm_banned_words():
+    """ Кэш запрещенных слов из базы данных. """
+    get_banned_words()
+    return {'keys': 1}
+
+
+def warm_auth():
+    """ Кэш прав и групп пользователей. """
+    return {'keys': warm_user_auth()}
+
+
+def warm_main_page():
+    """ Запросы главной страницы: опубликованные товары. """
+    return {'rows': load_view(MainListView)}
+
+
+def warm_category_page(pk):
+    """ Запросы первой страницы товаров категории. """
+    return {'rows': load_view(ProductListView, pk=pk)}
+
+
+def get_tasks(pages=PAGES):
+    """
+    Возвращает задачи прогрева: (название, функция, аргументы).
+    Кэш заполняется только при CACHE_ENABLED, страницы каталога
+    загружают в память базы данных их индексы и строки.
+    """
+    tasks = [('main_page', warm_main_page, ())]
+    if settings.CACHE_ENABLED:
+        tasks += [
+            ('categories', warm_categories, ()),
+            ('banned_words', warm_banned_words, ()),
+            ('user_auth', warm_auth, ()),
+        ]
+
+    if pages:
+        largest = Category.objects.annotate(
+            product_count=Count('product')
+        ).order_by('-product_count', 'pk').values_list('pk', flat=True)[:pages]
+        tasks += [('category_pages', warm_category_page, (pk,)) for pk in largest]
+
+    return tasks
+
+
+def run_task(task):
+    """ Выполняет задачу прогрева в потоке и замеряет ее время. """
+    name, function, args = task
+    start = time.perf_counter()
+    try:
+        result = function(*args)
+    finally:
+        # Каждый поток открывает свое соединение с базой данных.
+        connection.close()
+
+    return name, result, time.perf_counter() - start
+
+
+def warm_cache(pages=PAGES, workers=WORKERS):
+    """
+    Выполняет задачи прогрева параллельно. Возвращает по названиям
+    задач количество задач, ключей кэша, записей и время (сек.).
+    """
+    report = defaultdict(lambda: {'tasks': 0, 'keys': 0, 'rows': 0, 'seconds': 0.0})
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for name, result, seconds in executor.map(run_task, get_tasks(pages)):
+            report[name]['tasks'] += 1
+            report[name]['keys'] += result.get('keys', 0)
+            report[name]['rows'] += result.get('rows', 0)
+            report[name]['seconds'] += seconds
+
+    return dict(report)
+
+
+def start_warmup():
+    """
+    Запускает прогрев в фоновом потоке при CACHE_WARM_ON_STARTUP.
+    Вызывается модулями config.wsgi и config.asgi, которые импортирует
+    только процесс сервера: runserver - в дочернем процессе автоперезагрузки,
+    миграции, тесты и другие команды прогрев не запускают. При включенном
+    кэше прогрев выполняет только первый процесс, получивший блокировку.
+    """
+    if not settings.CACHE_WARM_ON_STARTUP:
+        return
+
+    def run():
+        try:
+            if settings.CACHE_ENABLED and not cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+                return
+            start = time.perf_counter()
+            report = warm_cache()
+            logger.info('Прогрев кэша выполнен за %.2f с: %s', time.perf_counter() - start, report)
+        except Exception:
+            logger.exception('Не удалось прогреть кэш.')
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name='cache-warmup', daemon=True).start()
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Прогрев кэша при старте процесса сервера (CACHE_WARM_ON_STARTUP).
+from catalog.warmup import start_warmup  # noqa: E402
+
+start_warmup()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import copy
 from pathlib import Path
 import os
 from dotenv import load_dotenv
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'catalog',
     'crispy_forms',
@@ -51,6 +53,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     # 'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'catalog.middleware.RequestMetricsMiddleware',
+    'catalog.middleware.PrimaryStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -73,6 +77,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'users.context_processors.user_groups',
             ],
         },
     },
@@ -91,9 +96,51 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         # 'HOST': os.getenv('POSTGRES_HOST'),  # Название сервиса в docker-compose.yaml
         # 'PORT': os.getenv('POSTGRES_PORT')
+        # Время жизни постоянного соединения (сек.), 0 - соединение на запрос.
+        'CONN_MAX_AGE': int(os.getenv('POSTGRES_CONN_MAX_AGE') or 60),
+        # Проверка постоянного соединения перед повторным использованием.
+        'CONN_HEALTH_CHECKS': os.getenv('POSTGRES_CONN_HEALTH_CHECKS') != 'False',
+        'OPTIONS': {},
     }
 }
 
+# Пул соединений psycopg 3 (заменяет постоянные соединения),
+# при CONN_HEALTH_CHECKS соединения проверяются при выдаче из пула.
+# https://docs.djangoproject.com/en/5.1/ref/databases/#connection-pool
+
+if os.getenv('POSTGRES_POOL'):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE') or 2),
+        'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE') or 10),
+        # Время ожидания свободного соединения (сек.).
+        'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT') or 10),
+        # Время простоя, после которого лишние соединения закрываются (сек.).
+        'max_idle': float(os.getenv('POSTGRES_POOL_MAX_IDLE') or 600),
+    }
+
+# Реплики для чтения: список host[:port][/name] через запятую.
+# Запись идет в default, чтение после записи пользователя остается
+# на default в течение REPLICA_STICKINESS секунд.
+
+REPLICA_DATABASES = []
+for number, replica in enumerate(filter(None, os.getenv('POSTGRES_REPLICAS', '').split(',')), 1):
+    address, __, name = replica.strip().partition('/')
+    host, __, port = address.partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST': host,
+        'PORT': port,
+        'NAME': name or DATABASES['default']['NAME'],
+        # В тестах реплики указывают на тестовую основную базу.
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['catalog.routers.PrimaryReplicaRouter']
+REPLICA_STICKINESS = int(os.getenv('REPLICA_STICKINESS') or 5)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -134,6 +181,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'catalog', 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Thumbnails: уменьшенные копии изображений в MEDIA_ROOT/THUMBNAIL_DIR.
+# Первая ширина набора - ширина отображения в шаблонах.
+
+THUMBNAIL_DIR = 'thumbnails'
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_SIZES = {
+    'product': (200, 400),
+    'category': (140, 280),
+    'blog': (400, 800),
+    'avatar': (70, 140),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -159,20 +219,30 @@ HOST = os.getenv('HOST', default='http://localhost:8000')
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-user-model
 
 AUTH_USER_MODEL = 'users.User'
+# Права и группы пользователей кэшируются между запросами.
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 LOGIN_URL = '/users/'
 
 # User email settings
 
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND') or 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_HOST = 'smtp.yandex.ru'
 EMAIL_PORT = 465
 EMAIL_HOST_USER = os.getenv('APP_EMAIL')
 EMAIL_HOST_PASSWORD = os.getenv('APP_PASSWORD')
 EMAIL_USE_SSL = True
 
+# Email outbox: письма отправляет команда send_emails.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
 # Cash register
 CACHE_ENABLED = os.getenv('CACHE_ENABLED')
+# Время жизни кэша каталога (сек.), сбрасывается сигналами при изменениях.
+CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT') or 60 * 60 * 12)
 
 if CACHE_ENABLED:
     CACHES = {
@@ -181,3 +251,59 @@ if CACHE_ENABLED:
             "LOCATION": os.getenv('CACHE_LOCATION'),
         }
     }
+
+# Прогрев кэша в фоне при запуске процесса сервера (config.wsgi, config.asgi).
+# Перед деплоем можно вызвать команду warm_cache.
+CACHE_WARM_ON_STARTUP = bool(os.getenv('CACHE_WARM_ON_STARTUP'))
+
+# Асинхронные представления каталога для запуска под ASGI (catalog.async_views).
+ASYNC_VIEWS = bool(os.getenv('ASYNC_VIEWS'))
+
+# Под ASGI синхронные запросы к базе выполняются в разных потоках,
+# и постоянные соединения не переиспользуются, а копятся до CONN_MAX_AGE:
+# соединение открывается на запрос или берется из пула (POSTGRES_POOL).
+if ASYNC_VIEWS:
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 0
+
+# Запрещенные слова и основы слов для модерации товаров,
+# дополняются записями BannedWord из базы данных.
+BANNED_WORDS = [
+    'казино', 'криптовалюта', 'крипта', 'биржа', 'дешево',
+    'бесплатно', 'обман', 'полиция', 'радар',
+]
+
+# Request metrics: количество и время SQL-запросов, Server-Timing, лог.
+# При QUERY_BUDGET_RAISE превышение бюджета запросов вызывает исключение,
+# тесты включают метрики и бюджеты через override_settings.
+
+REQUEST_METRICS_ENABLED = bool(os.getenv('REQUEST_METRICS_ENABLED'))
+QUERY_BUDGET_RAISE = bool(os.getenv('QUERY_BUDGET_RAISE'))
+QUERY_BUDGETS = {
+    'catalog:main': 10,
+    'catalog:categories': 10,
+    'catalog:goods': 10,
+    'catalog:product': 10,
+    'catalog:blog_list': 10,
+    'catalog:blog_detail': 10,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'catalog.metrics': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'catalog.warmup': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
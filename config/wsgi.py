@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Прогрев кэша при старте процесса сервера (CACHE_WARM_ON_STARTUP).
+from catalog.warmup import start_warmup  # noqa: E402
+
+start_warmup()
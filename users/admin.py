@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from users.models import User
+from users.models import User, OutgoingEmail
 
 
 @admin.register(User)
@@ -8,3 +8,9 @@ class UserAdmin(admin.ModelAdmin):
     """ Отображение товара в административной панели. """
     list_display = ('id', 'email', 'is_active',)
 
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """ Отображение очереди писем в административной панели. """
+    list_display = ('id', 'recipient', 'subject', 'created_at', 'sent_at', 'attempts',)
+    list_filter = ('sent_at',)
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from users.services import aget_user_auth, get_user_auth
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    Стандартная аутентификация Django, права пользователя в которой
+    при включенном кэше берутся из кэша прав и групп (get_user_auth).
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        """ Возвращает все права пользователя из кэша. """
+        if not settings.CACHE_ENABLED:
+            return super().get_all_permissions(user_obj, obj)
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = get_user_auth(user_obj)['permissions']
+        return user_obj._perm_cache
+
+    async def aget_all_permissions(self, user_obj, obj=None):
+        """ Асинхронная версия get_all_permissions. """
+        if not settings.CACHE_ENABLED:
+            return await super().aget_all_permissions(user_obj, obj)
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = (await aget_user_auth(user_obj))['permissions']
+        return user_obj._perm_cache
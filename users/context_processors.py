@@ -0,0 +1,13 @@
+from django.utils.functional import SimpleLazyObject
+
+from users.services import get_group_names
+
+
+def user_groups(request):
+    """
+    Добавляет в контекст шаблонов ленивое множество
+    названий групп текущего пользователя.
+    """
+    return {
+        'user_groups': SimpleLazyObject(lambda: get_group_names(request.user)),
+    }
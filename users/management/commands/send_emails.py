@@ -0,0 +1,30 @@
+import time
+
+from django.core.management import BaseCommand
+
+from users.services import send_queued_emails
+
+
+class Command(BaseCommand):
+    """ Отправляет письма из очереди (outbox) пакетами. """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            help='Количество писем в одном пакете.')
+        parser.add_argument('--max-attempts', type=int,
+                            help='Максимальное количество попыток отправки.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, проверяя очередь.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Пауза между проверками очереди (сек.).')
+
+    def handle(self, *args, **kwargs):
+        while True:
+            sent, failed = send_queued_emails(kwargs['batch_size'], kwargs['max_attempts'])
+            if sent or failed:
+                self.stdout.write(f'Отправлено писем: {sent}, отложено: {failed}.')
+                # В очереди могут остаться письма - сразу берем следующий пакет.
+                continue
+            if not kwargs['loop']:
+                break
+            time.sleep(kwargs['interval'])
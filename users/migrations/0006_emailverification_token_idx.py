@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:08
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицы,
+    # но не может выполняться внутри транзакции.
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_outgoingemail'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='emailverification',
+            index=models.Index(fields=['token'], name='email_verification_token_idx'),
+        ),
+    ]
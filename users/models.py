@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from catalog.models import NULLABLE
 
@@ -65,3 +66,38 @@ class EmailVerification(models.Model):
         """ Метаданные для модели верификации почты. """
         verbose_name = 'Токен для почты'
         verbose_name_plural = 'Токены для почты'
+        indexes = [
+            models.Index(fields=['token'], name='email_verification_token_idx'),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """ Модель письма в очереди на отправку (outbox). """
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    message = models.TextField(verbose_name='Текст письма')
+    from_email = models.CharField(max_length=255, verbose_name='Отправитель', **NULLABLE)
+    recipient = models.EmailField(verbose_name='Получатель')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    sent_at = models.DateTimeField(verbose_name='Отправлено', **NULLABLE)
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Попытки отправки')
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', **NULLABLE)
+
+    def __str__(self) -> str:
+        """ Возвращает строковое представление о классе письма. """
+        return f'{self.recipient}: "{self.subject}"'
+
+    class Meta:
+        """ Метаданные для модели письма в очереди. """
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx',
+            ),
+        ]
@@ -1,29 +1,224 @@
-from django.core.mail import send_mail
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from catalog.caching import acached, cached
+from users.models import OutgoingEmail, User
+
+
+def queue_email(subject, message, recipient_list):
+    """
+    Ставит письмо в очередь на отправку (outbox).
+    Вызывается в транзакции вместе с изменением данных,
+    письма отправляет команда send_emails.
+    """
+    OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(
+            subject=subject,
+            message=message,
+            from_email=settings.EMAIL_HOST_USER,
+            recipient=recipient,
+        )
+        for recipient in recipient_list
+    ])
 
 
 def send_new_password(new_password, email):
     """
-    Формирует и отправляет письмо
+    Формирует и ставит в очередь письмо
     с новым паролем на e-mail пользователя.
     """
-    send_mail(
+    queue_email(
         subject='Вы сменили пароль.',
         message=f'Ваш новый пароль: {new_password}',
-        from_email=settings.EMAIL_HOST_USER,
         recipient_list=[email]
     )
 
 
 def send_confirm_email(verification_url, new_user):
     """
-    Формирует и отправляет верификационное письмо
+    Формирует и ставит в очередь верификационное письмо
     на e-mail пользователя.
     """
-    send_mail(
+    queue_email(
         subject='Подтверждение почты SkyStore',
         message=f'Пожалуйста, перейдите по ссылке для подтверждения почты: '
                 f'{settings.HOST}{verification_url}',
-        from_email=settings.EMAIL_HOST_USER,
         recipient_list=[new_user.email]
     )
+
+
+def get_retry_delay(attempts):
+    """ Возвращает задержку перед повторной отправкой (экспоненциально). """
+    return timedelta(minutes=min(2 ** attempts, 24 * 60))
+
+
+def defer_email(email, error):
+    """ Откладывает неотправленное письмо до следующей попытки. """
+    email.attempts += 1
+    email.last_error = str(error)
+    email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+
+
+def send_queued_emails(batch_size=None, max_attempts=None):
+    """
+    Отправляет пакет писем из очереди через одно SMTP-соединение.
+    Неотправленные письма откладываются с увеличивающейся задержкой.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent = failed = 0
+
+    with transaction.atomic():
+        # Блокируем пакет, чтобы параллельные обработчики его пропустили.
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                attempts__lt=max_attempts,
+                next_attempt_at__lte=timezone.now(),
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        if not emails:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # Не удалось подключиться: откладываем весь пакет.
+            for email in emails:
+                defer_email(email, e)
+            failed = len(emails)
+        else:
+            try:
+                for email in emails:
+                    message = EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=[email.recipient],
+                        connection=connection,
+                    )
+                    try:
+                        message.send()
+                    except Exception as e:
+                        defer_email(email, e)
+                        failed += 1
+                    else:
+                        email.attempts += 1
+                        email.sent_at = timezone.now()
+                        sent += 1
+            finally:
+                connection.close()
+
+        OutgoingEmail.objects.bulk_update(
+            emails, ['attempts', 'sent_at', 'next_attempt_at', 'last_error']
+        )
+
+    return sent, failed
+
+
+def get_user_auth_key(pk):
+    """ Возвращает ключ кэша прав и групп пользователя. """
+    return f'user_auth_{pk}'
+
+
+def get_user_auth(user):
+    """
+    Возвращает права (app_label.codename) и названия групп пользователя
+    из кэша. Кэш сбрасывается сигналами при изменении групп и прав,
+    результат также запоминается на объекте пользователя.
+    """
+    if not hasattr(user, '_auth_data'):
+        user._auth_data = cached(
+            get_user_auth_key(user.pk), settings.CACHE_TIMEOUT,
+            lambda: {
+                'permissions': frozenset(ModelBackend().get_all_permissions(user)),
+                'groups': frozenset(user.groups.values_list('name', flat=True)),
+            },
+        )
+
+    return user._auth_data
+
+
+async def aget_user_auth(user):
+    """ Асинхронная версия get_user_auth. """
+    async def load():
+        permissions = await sync_to_async(ModelBackend().get_all_permissions)(user)
+        return {
+            'permissions': frozenset(permissions),
+            'groups': frozenset([
+                name async for name in user.groups.values_list('name', flat=True)
+            ]),
+        }
+
+    if not hasattr(user, '_auth_data'):
+        user._auth_data = await acached(get_user_auth_key(user.pk), settings.CACHE_TIMEOUT, load)
+
+    return user._auth_data
+
+
+def warm_user_auth():
+    """
+    Заполняет кэш прав и групп активных пользователей, у которых есть
+    группы или собственные права. Возвращает количество пользователей.
+    """
+    users = User.objects.filter(is_active=True).filter(
+        Q(is_superuser=True) | Q(groups__isnull=False) | Q(user_permissions__isnull=False)
+    ).distinct()
+    count = 0
+    for user in users.iterator():
+        get_user_auth(user)
+        count += 1
+
+    return count
+
+
+def invalidate_user_auth(user_ids):
+    """ Сбрасывает кэш прав и групп пользователей. """
+    if settings.CACHE_ENABLED:
+        cache.delete_many([get_user_auth_key(pk) for pk in user_ids])
+
+
+def get_group_names(user):
+    """
+    Возвращает множество названий групп пользователя.
+    При включенном кэше группы хранятся в нем между запросами,
+    иначе запоминаются на объекте пользователя на время запроса.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+
+    if settings.CACHE_ENABLED:
+        return get_user_auth(user)['groups']
+
+    if not hasattr(user, '_group_names'):
+        user._group_names = frozenset(
+            user.groups.values_list('name', flat=True)
+        )
+
+    return user._group_names
+
+
+async def aget_group_names(user):
+    """ Асинхронная версия get_group_names. """
+    if not user.is_authenticated:
+        return frozenset()
+
+    if settings.CACHE_ENABLED:
+        return (await aget_user_auth(user))['groups']
+
+    if not hasattr(user, '_group_names'):
+        user._group_names = frozenset([
+            name async for name in user.groups.values_list('name', flat=True)
+        ])
+
+    return user._group_names
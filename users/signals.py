@@ -0,0 +1,52 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import User
+from users.services import invalidate_user_auth
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Сбрасывает кэш прав пользователей после изменения их групп и прав. """
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_user_auth([instance.pk])
+    elif reverse and action in ('post_add', 'post_remove'):
+        invalidate_user_auth(pk_set)
+    elif reverse and action == 'pre_clear':
+        # Связи очищаются со стороны группы или разрешения.
+        invalidate_user_auth(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Сбрасывает кэш прав участников группы после изменения ее прав. """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # Права изменены со стороны разрешения: pk_set - группы.
+        groups = instance.group_set.all() if action == 'pre_clear' else pk_set
+        user_ids = User.objects.filter(groups__in=groups).values_list('pk', flat=True)
+    else:
+        user_ids = instance.user_set.values_list('pk', flat=True)
+    invalidate_user_auth(user_ids)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    """ Сбрасывает кэш участников группы после ее изменения или удаления. """
+    invalidate_user_auth(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает кэш прав пользователя после изменения его статусов
+    (is_active, is_superuser). Обновление времени входа не учитывается.
+    """
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_user_auth([instance.pk])
@@ -2,16 +2,22 @@ from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMix
 from django.contrib.auth.models import User
 from django.contrib.auth.views import LoginView as BaseLoginView
 from django.contrib.auth.views import LogoutView as BaseLogoutView
+from django.db import transaction
 from django.shortcuts import redirect
 from django.urls import reverse_lazy, reverse
 from django.utils.crypto import get_random_string
 from django.views import View
 from django.views.generic import CreateView, UpdateView, TemplateView, ListView
 
+from catalog.mixins import KeysetPaginationMixin
 from users.forms import UserRegisterForm, UserProfileForm
 from users.models import User, EmailVerification
 from users.services import send_new_password, send_confirm_email
 
+PASSWORD_LENGTH = 10  # Длина нового пароля при восстановлении.
+# Символы нового пароля, без похожих друг на друга (I, l, O, 0, 1).
+PASSWORD_CHARS = 'abcdefghjkmnpqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+
 
 class LoginView(BaseLoginView):
     """ Класс для отображения страницы с авторизацией. """
@@ -31,13 +37,14 @@ class PasswordTemplateView(TemplateView):
         """
         email = request.POST.get('email')
         # Генерируем новый пароль.
-        new_password = User.objects.make_random_password()
-        # Отправляем новый пароль на указанную почту пользователем.
-        send_new_password(new_password, email)
-        # Получаем нужного пользователя по e-mail и сохраняем новый пароль.
-        user = User.objects.get(email=email)
-        user.set_password(new_password)
-        user.save()
+        new_password = get_random_string(PASSWORD_LENGTH, PASSWORD_CHARS)
+        with transaction.atomic():
+            # Получаем нужного пользователя по e-mail и сохраняем новый пароль.
+            user = User.objects.get(email=email)
+            user.set_password(new_password)
+            user.save()
+            # Ставим в очередь письмо с новым паролем на почту пользователя.
+            send_new_password(new_password, email)
 
         return redirect(reverse('users:login'))
 
@@ -59,9 +66,10 @@ class ProfileView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
         return self.request.user
 
 
-class UserListView(ListView):
+class UserListView(KeysetPaginationMixin, ListView):
     """ Класс для отображения всех пользователей. """
     model = User
+    cursor_fields = ('id',)  # Поля курсора пагинации.
 
 
 class RegisterView(CreateView):
@@ -71,6 +79,7 @@ class RegisterView(CreateView):
     template_name = 'users/register.html'  # Шаблон формы регистрации.
     success_url = reverse_lazy('users:email_confirm')
 
+    @transaction.atomic
     def form_valid(self, form):
         """ Форма верификации нового пользователя с подтверждением. """
         new_user = form.save()
@@ -82,7 +91,7 @@ class RegisterView(CreateView):
         EmailVerification.objects.create(user=new_user, token=token)
 
         verification_url = reverse("users:email_verify", args=[token])
-        # Отправляем ссылку на почту пользователю для подтверждения.
+        # Ставим в очередь письмо со ссылкой для подтверждения почты.
         send_confirm_email(verification_url, new_user)
 
         return super().form_valid(form)